@@ -1,4 +1,8 @@
-from blog.models import Category, Comment, Location, Post
+from blog.cache import invalidate_all
+from blog.models import Category, Comment, ImageJob, Location, Post
+from blog.registry import invalidate_registry
+from blog.search import search_posts
+from blog.utils import touch_posts
 
 from django.contrib import admin
 
@@ -8,6 +12,9 @@ admin.site.empty_value_display = 'Не задано'
 @admin.action(description='Опубликовать')
 def make_published(modeladmin, request, queryset):
     queryset.update(is_published=True)
+    # update() не отправляет сигналы, поэтому кэш сбрасывается явно.
+    invalidate_all()
+    invalidate_registry()
 
 
 @admin.register(Post)
@@ -25,10 +32,16 @@ class PostAdmin(admin.ModelAdmin):
         'category',
         'location',
     )
-    search_fields = ('title',)
+    search_fields = ('title', 'text')
     list_filter = ('is_published',)
     actions = (make_published,)
 
+    def get_search_results(self, request, queryset, search_term):
+        # Поиск идёт по полнотекстовому индексу, а не LIKE по таблице.
+        if not search_term:
+            return queryset, False
+        return search_posts(queryset, search_term), False
+
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
@@ -68,3 +81,28 @@ class CommentAdmin(admin.ModelAdmin):
     list_editable = (
         'text',
     )
+
+    # У Comment нет обработчика post_delete, чтобы каскадное удаление
+    # постов оставалось быстрым: посты отмечаются изменёнными здесь.
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        touch_posts([obj.post_id])
+
+    def delete_queryset(self, request, queryset):
+        post_ids = set(queryset.values_list('post_id', flat=True))
+        super().delete_queryset(request, queryset)
+        touch_posts(post_ids)
+
+
+@admin.register(ImageJob)
+class ImageJobAdmin(admin.ModelAdmin):
+    list_display = (
+        'image',
+        'post',
+        'status',
+        'attempts',
+        'available_at',
+        'error',
+    )
+    list_filter = ('status',)
+    readonly_fields = ('post', 'image', 'started_at', 'finished_at', 'error')
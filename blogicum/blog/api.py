@@ -0,0 +1,292 @@
+from blog.cache import (
+    get_author_scope, get_category_scope, get_generation, get_index_scope,
+    get_last_modified, get_list_last_modified, get_profile_author)
+from blog.mixins import ConditionalGetMixin
+from blog.pagination import paginate_by_cursor, paginate_comments
+from blog.registry import get_registry
+from blog.models import Comment
+from blog.utils import get_valid_posts
+from core.constants import API_PAGE_SIZE
+
+from django.core.files.storage import default_storage
+from django.http import Http404, JsonResponse
+from django.views.generic import View
+
+# Поля поста в API и столбцы, из которых они выбираются. Категория
+# и местоположение берутся из реестра, а не присоединяются в запросе.
+POST_FIELDS = {
+    'id': 'id',
+    'title': 'title',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'updated_at': 'updated_at',
+    'is_published': 'is_published',
+    'author': 'author__username',
+    'category': 'category_id',
+    'location': 'location_id',
+    'image': 'image',
+    'image_width': 'image_width',
+    'image_height': 'image_height',
+    'comment_count': 'comment_count',
+}
+COMMENT_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'created_at': 'created_at',
+    'author': 'author__username',
+}
+
+
+class ApiError(Exception):
+    """Ошибка в параметрах запроса к API: ответ 400."""
+
+
+class ApiView(ConditionalGetMixin, View):
+    """Базовое представление API только для чтения.
+
+    Строки выбираются через values(), без создания объектов моделей.
+    Параметр ?fields=id,title ограничивает набор полей в ответе
+    и выбираемые столбцы. Ответ строит render() представления.
+    """
+
+    fields = POST_FIELDS
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            self.selected_fields = self.get_fields()
+        except ApiError as error:
+            return JsonResponse({'error': str(error)}, status=400)
+        return super().dispatch(request, *args, **kwargs)
+
+    def get(self, request, *args, **kwargs):
+        return self.conditional_response(request, self.render)
+
+    def get_fields(self):
+        if 'fields' not in self.request.GET:
+            return list(self.fields)
+        fields = [
+            name for name in self.request.GET['fields'].split(',') if name
+        ]
+        unknown = sorted(set(fields) - set(self.fields))
+        if unknown or not fields:
+            raise ApiError(
+                'Неизвестные поля: {}. Доступные поля: {}.'.format(
+                    ', '.join(unknown) or '—', ', '.join(self.fields)
+                )
+            )
+        return fields
+
+    def get_values(self, queryset, *required):
+        """values() с запрошенными полями и полями required,
+        нужными для пагинации и проверок.
+        """
+        columns = {
+            self.fields[name] for name in self.selected_fields
+        } | set(required)
+        return queryset.values(*columns)
+
+    def serialize(self, row):
+        registry = get_registry()
+        result = {}
+        for name in self.selected_fields:
+            value = row[self.fields[name]]
+            if name == 'category':
+                category = registry.categories.get(value)
+                value = category.slug if category else None
+            elif name == 'location':
+                location = registry.locations.get(value)
+                value = (
+                    location.name
+                    if location and location.is_published else None
+                )
+            elif name == 'image':
+                value = default_storage.url(value) if value else None
+            result[name] = value
+        return result
+
+    def get_page_response(self, page):
+        next_url = None
+        if page.has_next():
+            query = self.request.GET.copy()
+            query['cursor'] = page.next_cursor
+            next_url = self.request.build_absolute_uri(
+                f'{self.request.path}?{query.urlencode()}'
+            )
+        return JsonResponse({
+            'results': [self.serialize(row) for row in page],
+            'next': next_url,
+        })
+
+
+class PostListApiView(ApiView):
+    """Посты главной страницы, как в PostListView.
+
+    Листаются курсором ?cursor= от новых к старым.
+    """
+
+    def get_scope(self):
+        return get_index_scope()
+
+    def get_queryset(self):
+        return get_valid_posts(is_guest=True)
+
+    def get_validators(self):
+        scope = self.get_scope()
+        last_modified = get_list_last_modified(scope, self.get_queryset())
+        return (
+            self.get_etag(scope, last_modified, self.request.get_full_path()),
+            int(last_modified)
+        )
+
+    def render(self):
+        return self.get_page_response(paginate_by_cursor(
+            self.get_values(self.get_queryset(), 'id', 'pub_date'),
+            self.request.GET.get('cursor', ''),
+            API_PAGE_SIZE
+        ))
+
+
+class CategoryPostListApiView(PostListApiView):
+    """Посты категории, как в CategoryListView."""
+
+    def get_category(self):
+        category = get_registry().get_published_category(
+            self.kwargs['category_slug']
+        )
+        if category is None:
+            raise Http404('Категория не найдена.')
+        return category
+
+    def get_scope(self):
+        return get_category_scope(self.kwargs['category_slug'])
+
+    def get_queryset(self):
+        return super().get_queryset().filter(
+            category_id=self.get_category().pk
+        )
+
+
+class ProfilePostListApiView(PostListApiView):
+    """Посты автора, как в ProfileListView: автору видны и скрытые."""
+
+    def get_author(self):
+        if not hasattr(self, 'author'):
+            self.author = get_profile_author(self.kwargs['author'])
+        return self.author
+
+    def is_owner(self):
+        return self.request.user.pk == self.get_author().pk
+
+    def get_scope(self):
+        return get_author_scope(
+            self.get_author().username, is_owner=self.is_owner()
+        )
+
+    def get_queryset(self):
+        return get_valid_posts(is_guest=not self.is_owner()).filter(
+            author_id=self.get_author().pk
+        )
+
+
+def get_visible_posts(user, post_id):
+    """Пост post_id, если он виден пользователю user: как в
+    get_post_for_user_or_404, автору доступен и скрытый пост.
+    """
+    posts = get_valid_posts(is_guest=True).filter(pk=post_id)
+    if user.is_authenticated:
+        posts |= get_valid_posts().filter(pk=post_id, author_id=user.pk)
+    return posts
+
+
+class PostDetailApiView(ApiView):
+    """Пост, как в PostDetailView."""
+
+    def get_row(self):
+        if not hasattr(self, 'row'):
+            self.row = self.get_values(
+                get_visible_posts(self.request.user, self.kwargs['post_id']),
+                'updated_at'
+            ).first()
+        if self.row is None:
+            raise Http404('Публикация не найдена.')
+        return self.row
+
+    def get_updated_at(self):
+        return self.get_row()['updated_at']
+
+    def get_validators(self):
+        last_modified = max(
+            self.get_updated_at().timestamp(), get_last_modified()
+        )
+        return (
+            self.get_etag(
+                self.kwargs['post_id'], last_modified,
+                self.request.get_full_path()
+            ),
+            int(last_modified)
+        )
+
+    def render(self):
+        return JsonResponse(self.serialize(self.get_row()))
+
+
+class CommentListApiView(PostDetailApiView):
+    """Комментарии к посту в порядке добавления, с курсором ?cursor=.
+
+    Пост отмечается изменённым при каждом изменении его комментариев,
+    поэтому валидаторы те же, что у поста.
+    """
+
+    fields = COMMENT_FIELDS
+
+    def get_updated_at(self):
+        updated_at = get_visible_posts(
+            self.request.user, self.kwargs['post_id']
+        ).values_list('updated_at', flat=True).first()
+        if updated_at is None:
+            raise Http404('Публикация не найдена.')
+        return updated_at
+
+    def render(self):
+        return self.get_page_response(paginate_comments(
+            self.get_values(
+                Comment.objects.filter(post_id=self.kwargs['post_id']),
+                'id', 'created_at'
+            ),
+            self.request.GET.get('cursor', ''),
+            API_PAGE_SIZE
+        ))
+
+
+class CategoryListApiView(ApiView):
+    """Опубликованные категории из реестра."""
+
+    fields = {'slug': 'slug', 'title': 'title', 'description': 'description'}
+
+    def get_validators(self):
+        last_modified = get_last_modified()
+        return (
+            self.get_etag(
+                get_generation(), self.request.get_full_path()
+            ),
+            int(last_modified)
+        )
+
+    def render(self):
+        categories = sorted(
+            (
+                category for category in get_registry().categories.values()
+                if category.is_published
+            ),
+            key=lambda category: category.title
+        )
+        return JsonResponse({
+            'results': [
+                {
+                    name: getattr(category, name)
+                    for name in self.selected_fields
+                }
+                for category in categories
+            ],
+            'next': None,
+        })
@@ -0,0 +1,186 @@
+import hashlib
+import time
+
+from blog.models import Post, User
+from core.constants import PROFILE_CACHE_TIMEOUT, SITEMAP_SHARD_SIZE
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max
+from django.http import Http404
+from django.utils import timezone
+
+GENERATION_KEY = 'blog:generation'
+NEXT_PUBLICATION_KEY = 'blog:next_publication'
+SCHEDULE_VERSION_KEY = 'blog:schedule'
+
+
+def get_index_scope():
+    return 'index'
+
+
+def get_category_scope(slug):
+    return f'category:{slug}'
+
+
+def get_author_scope(username, is_owner=False):
+    return f'author:{username}:{"owner" if is_owner else "guest"}'
+
+
+def get_sitemap_scope(section, shard):
+    """Часть shard карты сайта section ('posts' или 'authors')."""
+    return f'sitemap:{section}:{shard}'
+
+
+def get_sitemap_shard(pk):
+    return pk // SITEMAP_SHARD_SIZE
+
+
+def get_generation():
+    """Поколение всего кэша блога.
+
+    Входит в ключи всех закэшированных данных и обновляется, когда меняется
+    то, что видно сразу во всех списках: категории, местоположения,
+    имена авторов.
+    """
+    return cache.get_or_set(GENERATION_KEY, _new_version, None)
+
+
+def invalidate_all():
+    """Сбрасывает весь кэш блога: счётчики, страницы и карточки."""
+    cache.set(GENERATION_KEY, _new_version(), None)
+
+
+def get_scope_version(scope):
+    """Версия области видимости: главной, категории или профиля."""
+    return cache.get_or_set(f'blog:scope:{scope}', _new_version, None)
+
+
+def invalidate_scopes(scopes):
+    """Сбрасывает закэшированные числа постов и страницы
+    в перечисленных областях видимости.
+    """
+    cache.set_many(
+        {f'blog:scope:{scope}': _new_version() for scope in scopes}, None
+    )
+
+
+def get_last_modified(scope=None):
+    """Время последнего сброса кэша блога или области видимости scope."""
+    versions = [get_generation()]
+    if scope is not None:
+        versions.append(get_scope_version(scope))
+    return max(float(version) for version in versions)
+
+
+def get_list_last_modified(scope, posts):
+    """Время изменения списка постов posts из области видимости scope.
+
+    Это позднейшее из времени сброса кэша области и, без планировщика
+    публикаций, даты последней видимой публикации: отложенная
+    публикация без планировщика кэш не сбрасывает.
+    """
+    last_modified = get_last_modified(scope)
+    if settings.PUBLICATION_SCHEDULER_ENABLED:
+        return last_modified
+    last_published = posts.aggregate(
+        last_published=Max('pub_date')
+    )['last_published']
+    if last_published is None:
+        return last_modified
+    return max(
+        last_modified, min(last_published, timezone.now()).timestamp()
+    )
+
+
+def get_post_scopes(posts):
+    """Области видимости, в которых выводятся посты из QuerySet posts."""
+    scopes = [get_index_scope()]
+    for pk, slug, username in posts.values_list(
+        'pk', 'category__slug', 'author__username'
+    ):
+        if slug is not None:
+            scopes.append(get_category_scope(slug))
+        scopes.append(get_author_scope(username))
+        scopes.append(get_author_scope(username, is_owner=True))
+        scopes.append(get_sitemap_scope('posts', get_sitemap_shard(pk)))
+    return scopes
+
+
+def get_profile_author(username):
+    """Автор профиля username с полями, которые выводит страница профиля.
+
+    Кэшируется по имени до сброса поколения кэша блога, которое
+    обновляется при изменении пользователя. Несуществующие имена
+    не кэшируются: пользователь с таким именем может появиться.
+    """
+    cache_key = f'blog:author:{get_generation()}:{username}'
+    author = cache.get(cache_key)
+    if author is None:
+        author = User.objects.only(
+            'username', 'first_name', 'last_name', 'date_joined', 'is_staff'
+        ).filter(username=username).first()
+        if author is None:
+            raise Http404('Пользователь не найден.')
+        cache.set(cache_key, author, PROFILE_CACHE_TIMEOUT)
+    return author
+
+
+def get_post_count_key(scope):
+    """Ключ кэша с числом постов в области видимости scope."""
+    return (
+        f'post_count:{get_generation()}:{scope}:{get_scope_version(scope)}'
+    )
+
+
+def get_page_cache_key(scope, path):
+    """Ключ кэша страницы path, относящейся к области видимости scope."""
+    path_hash = hashlib.md5(path.encode()).hexdigest()
+    return (
+        f'post_page:{get_generation()}:{scope}:{get_scope_version(scope)}:'
+        f'{path_hash}'
+    )
+
+
+def get_cache_timeout(timeout):
+    """Срок хранения данных, зависящих от времени публикации постов.
+
+    Не превышает timeout и истекает к ближайшей отложенной публикации,
+    чтобы она появилась в списках вовремя. Если запущен планировщик
+    публикаций (run_publication_scheduler), он сам сбрасывает кэш
+    в момент публикации, и срок не сокращается.
+    """
+    if settings.PUBLICATION_SCHEDULER_ENABLED:
+        return timeout
+    now = timezone.now()
+    next_publication = cache.get(NEXT_PUBLICATION_KEY)
+    if next_publication is None or (
+        next_publication and next_publication <= now
+    ):
+        next_publication = Post.objects.filter(
+            is_published=True, pub_date__gt=now
+        ).order_by('pub_date').values_list('pub_date', flat=True).first()
+        cache.set(NEXT_PUBLICATION_KEY, next_publication or False, timeout)
+    if not next_publication:
+        return timeout
+    until_publication = (next_publication - now).total_seconds()
+    return max(0, min(timeout, int(until_publication)))
+
+
+def invalidate_schedule():
+    """Сообщает об изменении расписания публикаций: сбрасывает время
+    ближайшей отложенной публикации и версию расписания,
+    за которой следит планировщик.
+    """
+    cache.delete(NEXT_PUBLICATION_KEY)
+    cache.set(SCHEDULE_VERSION_KEY, _new_version(), None)
+
+
+def get_schedule_version():
+    return cache.get(SCHEDULE_VERSION_KEY)
+
+
+def _new_version():
+    # Версия — время изменения. Если кэш вытеснит ключ версии,
+    # новая версия окажется позже и не совпадёт ни с одной из прежних.
+    return f'{time.time():.6f}'
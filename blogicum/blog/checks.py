@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+# Бэкенды, хранящие данные в памяти одного процесса.
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+)
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """Версии кэша блога и реестра должны быть общими для всех
+    процессов, иначе сброс доходит только до процесса, сохранившего
+    изменения.
+    """
+    backend = settings.CACHES['default']['BACKEND']
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [Warning(
+        f'Кэш default ({backend}) не общий для процессов: при нескольких'
+        ' процессах сервера они будут отдавать устаревшие страницы,'
+        ' а скрытые категории будут видны до перечитывания реестра.',
+        hint=(
+            'Используйте общий бэкенд кэша, например Memcached'
+            ' (PyMemcacheCache) или Redis.'
+        ),
+        id='blog.W001',
+    )]
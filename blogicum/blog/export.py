@@ -0,0 +1,91 @@
+import csv
+import json
+
+from blog.models import Comment, Post
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+EXPORT_BATCH_SIZE = 2000
+FORMATS = {
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
+# Выгружаемые таблицы: модель и пары (имя поля в выгрузке, столбец).
+EXPORTS = {
+    'posts': (Post, (
+        ('id', 'id'),
+        ('title', 'title'),
+        ('text', 'text'),
+        ('pub_date', 'pub_date'),
+        ('created_at', 'created_at'),
+        ('updated_at', 'updated_at'),
+        ('is_published', 'is_published'),
+        ('author', 'author__username'),
+        ('category', 'category__slug'),
+        ('category_title', 'category__title'),
+        ('location', 'location__name'),
+        ('image', 'image'),
+        ('comment_count', 'comment_count'),
+    )),
+    'comments': (Comment, (
+        ('id', 'id'),
+        ('post_id', 'post_id'),
+        ('author', 'author__username'),
+        ('text', 'text'),
+        ('created_at', 'created_at'),
+    )),
+}
+
+
+def iter_rows(kind, batch_size=EXPORT_BATCH_SIZE):
+    """Строки таблицы kind в порядке id.
+
+    Пакеты выбираются по id (без OFFSET) и читаются итератором,
+    поэтому память не зависит от размера таблицы.
+    """
+    model, fields = EXPORTS[kind]
+    rows = model.objects.order_by('pk').values_list(
+        *(column for _, column in fields)
+    )
+    last_pk = 0
+    while True:
+        count = 0
+        for row in rows.filter(pk__gt=last_pk)[:batch_size].iterator(
+            chunk_size=batch_size
+        ):
+            count += 1
+            last_pk = row[0]
+            yield row
+        if count < batch_size:
+            return
+
+
+def iter_jsonl(kind, batch_size=EXPORT_BATCH_SIZE):
+    names = [name for name, _ in EXPORTS[kind][1]]
+    for row in iter_rows(kind, batch_size):
+        yield json.dumps(
+            dict(zip(names, row)), cls=DjangoJSONEncoder, ensure_ascii=False
+        ) + '\n'
+
+
+class _Echo:
+    """Буфер для csv.writer, возвращающий записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(kind, batch_size=EXPORT_BATCH_SIZE):
+    writer = csv.writer(_Echo())
+    yield writer.writerow([name for name, _ in EXPORTS[kind][1]])
+    for row in iter_rows(kind, batch_size):
+        yield writer.writerow(row)
+
+
+def iter_export(kind, export_format, batch_size=EXPORT_BATCH_SIZE):
+    """Выгрузка таблицы kind ('posts' или 'comments') построчно
+    в формате export_format ('jsonl' или 'csv').
+    """
+    if export_format == 'csv':
+        return iter_csv(kind, batch_size)
+    return iter_jsonl(kind, batch_size)
@@ -0,0 +1,180 @@
+import hashlib
+
+from blog.cache import (
+    get_author_scope, get_cache_timeout, get_category_scope, get_index_scope,
+    get_list_last_modified, get_page_cache_key, get_profile_author)
+from blog.registry import get_registry
+from blog.utils import get_valid_posts
+from core.constants import FEED_CACHE_TIMEOUT, FEED_ITEMS
+
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.http import Http404, HttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from django.utils.text import Truncator
+
+
+class PostFeed(Feed):
+    """Лента последних видимых гостям постов.
+
+    Готовая лента кэшируется по области видимости get_cache_scope()
+    вместе со своими ETag и Last-Modified и сбрасывается вместе с кэшем
+    списков постов. На условные GET-запросы лента отвечает
+    304 Not Modified.
+    """
+
+    def get_cache_scope(self, obj):
+        raise NotImplementedError(
+            'Определите get_cache_scope() в ленте.'
+        )
+
+    def get_posts(self, obj):
+        return get_valid_posts(is_guest=True)
+
+    def items(self, obj):
+        return self.get_posts(obj).order_by('-pub_date', '-pk')[:FEED_ITEMS]
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return Truncator(item.text).words(50)
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_updateddate(self, item):
+        return item.updated_at
+
+    def item_author_name(self, item):
+        return item.author.username
+
+    def get_last_modified(self, obj):
+        return get_list_last_modified(
+            self.get_cache_scope(obj), self.get_posts(obj)
+        )
+
+    def __call__(self, request, *args, **kwargs):
+        obj = self.get_object(request, *args, **kwargs)
+        scope = self.get_cache_scope(obj)
+        # Лента содержит абсолютные адреса, поэтому ETag и ключ кэша
+        # зависят от схемы и хоста запроса.
+        url = request.build_absolute_uri(request.path)
+        cache_key = get_page_cache_key(scope, url)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return self.get_cached_response(request, *cached)
+        last_modified = self.get_last_modified(obj)
+        etag = quote_etag(hashlib.md5(
+            f'{scope}:{last_modified}:{url}'.encode()
+        ).hexdigest())
+        last_modified = http_date(int(last_modified))
+        response = get_conditional_response(
+            request, etag=etag,
+            last_modified=parse_http_date_safe(last_modified)
+        )
+        if response is None:
+            response = super().__call__(request, *args, **kwargs)
+            cache.set(
+                cache_key,
+                (response.content, response['Content-Type'], etag,
+                 last_modified),
+                get_cache_timeout(FEED_CACHE_TIMEOUT)
+            )
+        response['ETag'] = etag
+        response['Last-Modified'] = last_modified
+        return response
+
+    def get_cached_response(
+            self, request, content, content_type, etag, last_modified
+    ):
+        """Ответ из кэша: валидаторы сохранены вместе с лентой,
+        поэтому запросов к базе не требуется.
+        """
+        response = get_conditional_response(
+            request, etag=etag,
+            last_modified=parse_http_date_safe(last_modified)
+        )
+        if response is None:
+            response = HttpResponse(content, content_type=content_type)
+        response['ETag'] = etag
+        response['Last-Modified'] = last_modified
+        return response
+
+
+class IndexFeed(PostFeed):
+    title = 'Блогикум'
+    description = 'Новые публикации Блогикума.'
+
+    def link(self):
+        return reverse('blog:index')
+
+    def get_cache_scope(self, obj):
+        return get_index_scope()
+
+
+class CategoryFeed(PostFeed):
+
+    def get_object(self, request, category_slug):
+        category = get_registry().get_published_category(category_slug)
+        if category is None:
+            raise Http404('Категория не найдена.')
+        return category
+
+    def get_cache_scope(self, obj):
+        return get_category_scope(obj.slug)
+
+    def get_posts(self, obj):
+        return super().get_posts(obj).filter(category_id=obj.pk)
+
+    def title(self, obj):
+        return f'Блогикум: {obj.title}'
+
+    def description(self, obj):
+        return obj.description
+
+    def link(self, obj):
+        return reverse('blog:category_posts', args=(obj.slug,))
+
+
+class AuthorFeed(PostFeed):
+
+    def get_object(self, request, author):
+        return get_profile_author(author)
+
+    def get_cache_scope(self, obj):
+        return get_author_scope(obj.username)
+
+    def get_posts(self, obj):
+        return super().get_posts(obj).filter(author_id=obj.pk)
+
+    def title(self, obj):
+        return f'Блогикум: публикации {obj.username}'
+
+    def description(self, obj):
+        return f'Новые публикации пользователя {obj.username}.'
+
+    def link(self, obj):
+        return reverse('blog:profile', args=(obj.username,))
+
+
+class IndexAtomFeed(IndexFeed):
+    feed_type = Atom1Feed
+    subtitle = IndexFeed.description
+
+
+class CategoryAtomFeed(CategoryFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self.description(obj)
+
+
+class AuthorAtomFeed(AuthorFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self.description(obj)
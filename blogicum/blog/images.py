@@ -0,0 +1,127 @@
+import os
+from io import BytesIO
+
+from core.constants import (
+    POST_IMAGE_CARD_WIDTH, POST_IMAGE_QUALITY, POST_IMAGE_WIDTHS)
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+
+# Значения тега Orientation, при которых фото повёрнуто на 90°.
+ROTATED_ORIENTATIONS = (5, 6, 7, 8)
+ORIENTATION_TAG = 0x0112
+
+
+def get_dimensions(file):
+    """Ширина и высота фото file с учётом поворота из EXIF.
+
+    Читается только заголовок файла, без декодирования изображения.
+    """
+    file.seek(0)
+    with Image.open(file) as image:
+        width, height = image.size
+        if image.getexif().get(ORIENTATION_TAG) in ROTATED_ORIENTATIONS:
+            width, height = height, width
+    file.seek(0)
+    return width, height
+
+
+def get_variant_name(name, width):
+    """Имя уменьшенной копии фото name шириной width.
+
+    Копия хранится рядом с оригиналом: posts_images/photo_w640.jpg.
+    """
+    root, ext = os.path.splitext(name)
+    return f'{root}_w{width}{ext}'
+
+
+def get_webp_name(name):
+    """Имя WebP-версии файла name: posts_images/photo_w640.webp."""
+    return f'{os.path.splitext(name)[0]}.webp'
+
+
+def generate_variants(name, storage=default_storage):
+    """Создаёт уменьшенные копии фото name шириной POST_IMAGE_WIDTHS
+    и их WebP-версии.
+
+    Копии не шире оригинала не создаются, уже созданные файлы
+    не пересоздаются. Функция не обращается к базе, поэтому её можно
+    выполнять в отдельном процессе.
+    """
+    with storage.open(name, 'rb') as image, Image.open(image) as original:
+        image_format = original.format
+        original = ImageOps.exif_transpose(original)
+        for width in POST_IMAGE_WIDTHS:
+            if width >= original.width:
+                continue
+            variant_name = get_variant_name(name, width)
+            webp_name = get_webp_name(variant_name)
+            if storage.exists(variant_name) and storage.exists(webp_name):
+                continue
+            variant = original.resize(
+                (width, round(original.height * width / original.width)),
+                Image.Resampling.LANCZOS
+            )
+            if not storage.exists(variant_name):
+                if image_format == 'JPEG' and variant.mode != 'RGB':
+                    variant = variant.convert('RGB')
+                storage.save(variant_name, ContentFile(
+                    _encode(variant, image_format)
+                ))
+            _save_webp(variant, image_format, variant_name, storage)
+
+
+def _encode(image, image_format, **options):
+    content = BytesIO()
+    image.save(
+        content, image_format,
+        quality=POST_IMAGE_QUALITY, optimize=True, **options
+    )
+    return content.getvalue()
+
+
+def _save_webp(image, image_format, variant_name, storage):
+    """Сохраняет WebP-версию копии. PNG сжимается без потерь, и WebP
+    сохраняется, только если он меньше PNG.
+    """
+    if storage.exists(get_webp_name(variant_name)):
+        return
+    lossless = image_format == 'PNG'
+    content = _encode(image, 'WEBP', lossless=lossless)
+    if lossless and len(content) >= storage.size(variant_name):
+        return
+    storage.save(get_webp_name(variant_name), ContentFile(content))
+
+
+def get_variants(image, webp=False):
+    """Готовые уменьшенные копии фото image (или их WebP-версии):
+    список пар (ширина, url).
+    """
+    storage = image.storage
+    variants = []
+    for width in POST_IMAGE_WIDTHS:
+        name = get_variant_name(image.name, width)
+        if webp:
+            name = get_webp_name(name)
+        if storage.exists(name):
+            variants.append((width, storage.url(name)))
+    return variants
+
+
+def get_srcset(image, webp=False):
+    """Значение атрибута srcset для фото image."""
+    return ', '.join(
+        f'{url} {width}w' for width, url in get_variants(image, webp)
+    )
+
+
+def get_card_url(image):
+    """Адрес копии фото для карточки или оригинала, пока копии
+    не созданы (см. process_image_jobs) или если оригинал уже.
+    """
+    for width, url in get_variants(image):
+        if width == POST_IMAGE_CARD_WIDTH:
+            return url
+    return image.url
@@ -0,0 +1,214 @@
+import itertools
+import json
+import os
+
+from blog.cache import invalidate_all
+from blog.models import Category, Comment, Location, Post, User
+from blog.registry import invalidate_registry
+from blog.utils import keep_created_at
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+IMPORT_BATCH_SIZE = 1000
+IMPORTS = ('posts', 'comments')
+
+
+class ImportRowError(ValueError):
+    """Строка выгрузки не может быть импортирована."""
+
+
+class LookupCache:
+    """Соответствие естественных ключей (имени пользователя, слага
+    категории, названия места) первичным ключам.
+
+    Ключи однажды найденных объектов в базу повторно не запрашиваются,
+    а недостающие объекты создаются одним bulk_create на пакет.
+    """
+
+    def __init__(self, model, field, build):
+        self.model = model
+        self.field = field
+        self.build = build
+        self.pks = {}
+        self.created = 0
+
+    def resolve(self, rows_by_key):
+        """Находит или создаёт объекты для ключей rows_by_key;
+        значение словаря — строка, по которой создаётся объект.
+        """
+        missing = [key for key in rows_by_key if key not in self.pks]
+        if not missing:
+            return
+        self._load(missing)
+        new = [key for key in missing if key not in self.pks]
+        if new:
+            self.model.objects.bulk_create(
+                [self.build(key, rows_by_key[key]) for key in new]
+            )
+            self.created += len(new)
+            # SQLite не возвращает ключи из bulk_create: перечитываем их.
+            self._load(new)
+
+    def _load(self, keys):
+        # При совпадающих ключах (названия мест не уникальны)
+        # выигрывает объект с наименьшим pk.
+        self.pks.update(
+            self.model.objects.filter(
+                **{f'{self.field}__in': keys}
+            ).order_by('-pk').values_list(self.field, 'pk')
+        )
+
+
+def _build_user(username, row):
+    return User(username=username, password=make_password(None))
+
+
+def _build_category(slug, row):
+    return Category(
+        slug=slug, title=row.get('category_title') or slug, description=''
+    )
+
+
+def _build_location(name, row):
+    return Location(name=name)
+
+
+def _by_key(rows, key):
+    return {row[key]: row for row in rows if row.get(key)}
+
+
+def _get_created_at(row, now):
+    created_at = row.get('created_at')
+    return parse_datetime(created_at) if created_at else now
+
+
+class Importer:
+    """Вставляет пакеты строк выгрузки (см. blog.export) через
+    bulk_create, по одной транзакции на пакет.
+
+    Строки с id сохраняют его, чтобы комментарии ссылались на
+    импортированные посты; уже существующие id пропускаются, поэтому
+    повторный импорт пакета после сбоя не создаёт дублей.
+    """
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.authors = LookupCache(User, 'username', _build_user)
+        self.categories = LookupCache(Category, 'slug', _build_category)
+        self.locations = LookupCache(Location, 'name', _build_location)
+
+    def import_batch(self, rows):
+        """Импортирует пакет; возвращает число вставленных
+        и пропущенных строк.
+        """
+        model = Post if self.kind == 'posts' else Comment
+        with transaction.atomic():
+            try:
+                if model is Post:
+                    objects = self._build_posts(rows)
+                else:
+                    objects = self._build_comments(rows)
+            except KeyError as error:
+                raise ImportRowError(
+                    f'В пакете нет обязательного поля {error}'
+                )
+            objects = self._drop_existing(model, objects)
+            with keep_created_at(model):
+                model.objects.bulk_create(objects)
+        # Сигналы сохранения не срабатывают, поэтому кэш и реестр
+        # сбрасываются целиком; индекс поиска и счётчики комментариев
+        # обновляют триггеры.
+        invalidate_all()
+        invalidate_registry()
+        return len(objects), len(rows) - len(objects)
+
+    def _build_posts(self, rows):
+        self.authors.resolve(_by_key(rows, 'author'))
+        self.categories.resolve(_by_key(rows, 'category'))
+        self.locations.resolve(_by_key(rows, 'location'))
+        now = timezone.now()
+        return [
+            Post(
+                id=row.get('id'),
+                title=row['title'],
+                text=row['text'],
+                pub_date=parse_datetime(row['pub_date']),
+                is_published=row.get('is_published', True),
+                author_id=self.authors.pks[row['author']],
+                category_id=self.categories.pks.get(row.get('category')),
+                location_id=self.locations.pks.get(row.get('location')),
+                image=row.get('image') or '',
+                created_at=_get_created_at(row, now),
+            )
+            for row in rows
+        ]
+
+    def _build_comments(self, rows):
+        self.authors.resolve(_by_key(rows, 'author'))
+        post_ids = set(Post.objects.filter(
+            pk__in={row['post_id'] for row in rows}
+        ).values_list('pk', flat=True))
+        now = timezone.now()
+        return [
+            Comment(
+                id=row.get('id'),
+                post_id=row['post_id'],
+                author_id=self.authors.pks[row['author']],
+                text=row['text'],
+                created_at=_get_created_at(row, now),
+            )
+            for row in rows if row['post_id'] in post_ids
+        ]
+
+    @staticmethod
+    def _drop_existing(model, objects):
+        ids = [obj.pk for obj in objects if obj.pk is not None]
+        if not ids:
+            return objects
+        existing = set(model.objects.filter(
+            pk__in=ids
+        ).values_list('pk', flat=True))
+        return [obj for obj in objects if obj.pk not in existing]
+
+
+def iter_batches(file, start=0, batch_size=IMPORT_BATCH_SIZE):
+    """Пакеты строк JSONL начиная со строки start.
+
+    Возвращает пары (номер последней прочитанной строки, строки пакета).
+    """
+    line_number = start
+    rows = []
+    for line_number, line in enumerate(
+        itertools.islice(file, start, None), start + 1
+    ):
+        if not line.strip():
+            continue
+        try:
+            rows.append(json.loads(line))
+        except ValueError as error:
+            raise ImportRowError(f'Строка {line_number}: {error}')
+        if len(rows) == batch_size:
+            yield line_number, rows
+            rows = []
+    if rows:
+        yield line_number, rows
+
+
+def read_checkpoint(path):
+    """Номер последней импортированной строки или 0."""
+    try:
+        with open(path, encoding='utf-8') as file:
+            return int(file.read())
+    except FileNotFoundError:
+        return 0
+
+
+def write_checkpoint(path, line_number):
+    # Запись через временный файл: сбой не оставит файл пустым.
+    temporary = f'{path}.tmp'
+    with open(temporary, 'w', encoding='utf-8') as file:
+        file.write(str(line_number))
+    os.replace(temporary, path)
@@ -0,0 +1,104 @@
+from datetime import timedelta
+
+from blog.cache import get_post_scopes, invalidate_scopes
+from blog.models import ImageJob, Post
+from core.constants import (
+    IMAGE_JOB_MAX_ATTEMPTS, IMAGE_JOB_RETRY_DELAY, IMAGE_JOB_TIMEOUT)
+
+from django.db.models import Count, F, Min, Q
+from django.utils import timezone
+
+
+def enqueue_image_job(post):
+    """Ставит в очередь создание уменьшенных копий фото поста."""
+    return ImageJob.objects.create(post=post, image=post.image.name)
+
+
+def claim_image_jobs(limit):
+    """Забирает в работу до limit готовых к обработке заданий.
+
+    Задание захватывается условным UPDATE, поэтому несколько
+    обработчиков не возьмут одно и то же задание. Задания, брошенные
+    упавшим обработчиком, возвращаются в очередь по IMAGE_JOB_TIMEOUT,
+    а исчерпавшие попытки (например, каждый раз роняющие обработчик)
+    отмечаются неудачными.
+    """
+    now = timezone.now()
+    abandoned = ImageJob.objects.filter(
+        status=ImageJob.Status.RUNNING,
+        started_at__lt=now - timedelta(seconds=IMAGE_JOB_TIMEOUT)
+    )
+    abandoned.filter(attempts__gte=IMAGE_JOB_MAX_ATTEMPTS).update(
+        status=ImageJob.Status.FAILED,
+        finished_at=now,
+        error='Обработчик не завершил задание за отведённое время.'
+    )
+    abandoned.update(status=ImageJob.Status.PENDING, available_at=now)
+    candidates = ImageJob.objects.filter(
+        status=ImageJob.Status.PENDING, available_at__lte=now
+    ).values_list('pk', flat=True)[:limit]
+    claimed = [
+        pk for pk in candidates
+        if ImageJob.objects.filter(
+            pk=pk, status=ImageJob.Status.PENDING
+        ).update(
+            status=ImageJob.Status.RUNNING,
+            attempts=F('attempts') + 1,
+            started_at=now
+        )
+    ]
+    return list(ImageJob.objects.filter(pk__in=claimed))
+
+
+def complete_image_job(job):
+    """Отмечает задание выполненным и сбрасывает кэш карточек
+    и страниц с постом, чтобы они вывели уменьшенные копии.
+    """
+    job.status = ImageJob.Status.DONE
+    job.finished_at = timezone.now()
+    job.error = ''
+    job.save(update_fields=('status', 'finished_at', 'error'))
+    # Фото могли заменить, пока задание ждало в очереди.
+    posts = Post.objects.filter(pk=job.post_id, image=job.image)
+    if posts.update(updated_at=job.finished_at):
+        invalidate_scopes(get_post_scopes(posts))
+
+
+def fail_image_job(job, error):
+    """Возвращает задание в очередь с растущей задержкой или,
+    если попытки исчерпаны, отмечает его неудачным.
+    """
+    job.error = error
+    if job.attempts >= IMAGE_JOB_MAX_ATTEMPTS:
+        job.status = ImageJob.Status.FAILED
+        job.finished_at = timezone.now()
+    else:
+        job.status = ImageJob.Status.PENDING
+        job.available_at = timezone.now() + timedelta(
+            seconds=IMAGE_JOB_RETRY_DELAY * 2 ** (job.attempts - 1)
+        )
+    job.save(
+        update_fields=('status', 'error', 'available_at', 'finished_at')
+    )
+
+
+def get_image_job_metrics():
+    """Состояние очереди: размер, число повторов и возраст
+    самого старого ожидающего задания в секундах.
+    """
+    now = timezone.now()
+    pending = Q(status=ImageJob.Status.PENDING)
+    metrics = ImageJob.objects.aggregate(
+        backlog=Count('pk', filter=pending),
+        ready=Count('pk', filter=pending & Q(available_at__lte=now)),
+        retrying=Count('pk', filter=pending & Q(attempts__gt=0)),
+        running=Count('pk', filter=Q(status=ImageJob.Status.RUNNING)),
+        failed=Count('pk', filter=Q(status=ImageJob.Status.FAILED)),
+        done=Count('pk', filter=Q(status=ImageJob.Status.DONE)),
+        oldest=Min('created_at', filter=pending),
+    )
+    oldest = metrics.pop('oldest')
+    metrics['oldest_age'] = (
+        round((now - oldest).total_seconds()) if oldest else 0
+    )
+    return metrics
@@ -0,0 +1,58 @@
+from blog.images import get_dimensions
+from blog.models import Post
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет ширину и высоту фото у постов, загруженных до появления'
+        ' этих полей. Посты обрабатываются пакетами; из файлов читаются'
+        ' только заголовки.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help='Количество постов, обрабатываемых за один запрос.'
+        )
+
+    def handle(self, *args, batch_size, **options):
+        filled = missing = 0
+        last_pk = 0
+        posts = Post.objects.exclude(image='').filter(
+            image_width__isnull=True
+        ).order_by('pk')
+        while True:
+            batch = list(
+                posts.filter(pk__gt=last_pk).only('pk', 'image')[:batch_size]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            measured = []
+            for post in batch:
+                try:
+                    with default_storage.open(post.image.name, 'rb') as file:
+                        post.image_width, post.image_height = (
+                            get_dimensions(file)
+                        )
+                except (OSError, ValueError) as error:
+                    missing += 1
+                    self.stderr.write(f'Пост {post.pk}: {error}')
+                    continue
+                measured.append(post)
+            # bulk_update не меняет updated_at и не сбрасывает кэш:
+            # закэшированные карточки получат размеры фото по истечении
+            # срока хранения.
+            Post.objects.bulk_update(
+                measured, ('image_width', 'image_height')
+            )
+            filled += len(measured)
+        self.stdout.write(self.style.SUCCESS(
+            f'Заполнено постов: {filled}.'
+            f' Не удалось прочитать фото: {missing}.'
+        ))
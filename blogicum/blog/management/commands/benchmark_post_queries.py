@@ -0,0 +1,119 @@
+import time
+
+from blog.models import Category, Post
+from blog.seeding import BenchmarkSeeder
+from blog.utils import get_valid_posts
+from core.constants import POSTS_ON_PAGE
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils.text import capfirst
+
+User = get_user_model()
+# Собственный префикс: данные seed_benchmark (префикс benchmark)
+# уже могут быть в базе, а имена и слаги уникальны.
+BENCHMARK_PREFIX = 'benchmark_queries'
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу большим набором постов и выводит планы запросов'
+        ' (EXPLAIN) и время выполнения запросов списков постов'
+        ' без индексов Post.Meta.indexes и с ними. Все изменения'
+        ' откатываются после замеров.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=100_000)
+        parser.add_argument('--authors', type=int, default=100)
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.seed(options)
+            queries = self.get_queries()
+            self.stdout.write(self.style.MIGRATE_HEADING('Без индексов'))
+            self.run_statements(
+                index.remove_sql(Post, connection.schema_editor())
+                for index in Post._meta.indexes
+            )
+            self.measure(queries, options['repeat'])
+            self.stdout.write(self.style.MIGRATE_HEADING('С индексами'))
+            self.run_statements(
+                index.create_sql(Post, connection.schema_editor())
+                for index in Post._meta.indexes
+            )
+            self.measure(queries, options['repeat'])
+            transaction.set_rollback(True)
+
+    def seed(self, options):
+        seeder = BenchmarkSeeder(
+            seed=options['seed'], prefix=BENCHMARK_PREFIX, report=self.report
+        )
+        seeder.seed(
+            users=options['authors'], categories=options['categories'],
+            locations=0, posts=options['posts'], comments=0
+        )
+        self.authors = list(User.objects.filter(pk__in=seeder.user_pks[:1]))
+        self.categories = list(
+            Category.objects.filter(pk__in=seeder.category_pks)
+        )
+
+    def report(self, model, count, elapsed):
+        self.stdout.write(
+            f'{capfirst(model._meta.verbose_name_plural)}: {count}'
+            f' за {elapsed:.1f} с'
+        )
+
+    def get_queries(self):
+        category = next(c for c in self.categories if c.is_published)
+        author = self.authors[0]
+        # Те же запросы, что строят представления списков.
+        lists = {
+            'Главная': get_valid_posts(is_guest=True),
+            'Категория': get_valid_posts(is_guest=True).filter(
+                category_id=category.pk
+            ),
+            'Профиль (гость)': get_valid_posts(is_guest=True).filter(
+                author_id=author.pk
+            ),
+            'Профиль (автор)': get_valid_posts().filter(author_id=author.pk),
+        }
+        queries = {}
+        for name, posts in lists.items():
+            queries[f'{name}: первая страница'] = (
+                posts[:POSTS_ON_PAGE], list
+            )
+            queries[f'{name}: страница 100'] = (
+                posts[POSTS_ON_PAGE * 99:POSTS_ON_PAGE * 100], list
+            )
+            queries[f'{name}: число постов'] = (
+                posts, lambda queryset: queryset.count()
+            )
+        return queries
+
+    def run_statements(self, statements):
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(str(statement))
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}')
+            return '\n'.join(str(row[-1]) for row in cursor.fetchall())
+
+    def measure(self, queries, repeat):
+        for name, (queryset, evaluate) in queries.items():
+            timings = []
+            for _ in range(repeat):
+                with CaptureQueriesContext(connection) as captured:
+                    started = time.perf_counter()
+                    evaluate(queryset.all())
+                    timings.append(time.perf_counter() - started)
+            self.stdout.write(self.style.SQL_TABLE(name))
+            self.stdout.write(self.explain(captured[-1]['sql']))
+            self.stdout.write(f'Лучшее время: {min(timings) * 1000:.2f} мс\n')
@@ -0,0 +1,41 @@
+from blog.export import EXPORT_BATCH_SIZE, EXPORTS, FORMATS, iter_export
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает посты (с автором, категорией и местоположением) или'
+        ' комментарии в JSONL или CSV. Строки читаются пакетами по id,'
+        ' поэтому память не растёт с размером таблиц.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=EXPORTS)
+        parser.add_argument(
+            '--format', dest='export_format', choices=FORMATS,
+            default='jsonl'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=EXPORT_BATCH_SIZE,
+            help='Количество строк, выбираемых за один запрос.'
+        )
+        parser.add_argument(
+            '--output', help='Файл для выгрузки; по умолчанию stdout.'
+        )
+
+    def handle(self, *args, kind, export_format, batch_size, output,
+               **options):
+        lines = iter_export(kind, export_format, batch_size)
+        if output is None:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        written = 0
+        with open(output, 'w', encoding='utf-8', newline='') as file:
+            for line in lines:
+                file.write(line)
+                written += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Записано строк в {output}: {written}'
+        ))
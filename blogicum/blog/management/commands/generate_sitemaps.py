@@ -0,0 +1,36 @@
+from blog.sitemaps import get_shards, get_sitemap_cache_key, stream_sitemap
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        'Заранее строит части карты сайта и сохраняет их в кэш.'
+        ' Перестраиваются только части, которых нет в кэше: новые'
+        ' и те, посты которых изменились.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'base_url',
+            help='Адрес сайта без завершающего слеша,'
+                 ' например https://blogicum.example.'
+        )
+
+    def handle(self, *args, base_url, **options):
+        base_url = base_url.rstrip('/')
+        built = skipped = 0
+        for section, shard in get_shards():
+            if cache.get(
+                get_sitemap_cache_key(section, shard, base_url)
+            ) is not None:
+                skipped += 1
+                continue
+            for _ in stream_sitemap(section, shard, base_url):
+                pass
+            built += 1
+            self.stdout.write(f'Построена часть {section}-{shard}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Построено частей: {built}. Без изменений: {skipped}.'
+        ))
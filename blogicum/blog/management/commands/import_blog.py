@@ -0,0 +1,73 @@
+import os
+import time
+
+from blog.imports import (IMPORT_BATCH_SIZE, IMPORTS, Importer,
+                          ImportRowError, iter_batches, read_checkpoint,
+                          write_checkpoint)
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        'Импортирует посты или комментарии из JSONL в формате export_blog.'
+        ' Недостающие авторы, категории и местоположения создаются'
+        ' пакетами. После каждого пакета номер строки записывается в файл'
+        ' контрольной точки, с которой импорт продолжается после сбоя.'
+        ' Фото не обрабатываются: файлы переносятся отдельно, а размеры'
+        ' заполняет backfill_image_dimensions.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=IMPORTS)
+        parser.add_argument('path', help='Файл JSONL.')
+        parser.add_argument(
+            '--batch-size', type=int, default=IMPORT_BATCH_SIZE,
+            help='Количество строк, вставляемых в одной транзакции.'
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='Файл контрольной точки; по умолчанию <path>.checkpoint.'
+        )
+        parser.add_argument(
+            '--restart', action='store_true',
+            help='Начать с первой строки, не глядя на контрольную точку.'
+        )
+
+    def handle(self, *args, kind, path, batch_size, checkpoint, restart,
+               **options):
+        checkpoint = checkpoint or f'{path}.checkpoint'
+        start = 0 if restart else read_checkpoint(checkpoint)
+        if start:
+            self.stdout.write(f'Продолжение со строки {start + 1}')
+        importer = Importer(kind)
+        inserted = skipped = 0
+        started = time.monotonic()
+        try:
+            with open(path, encoding='utf-8') as file:
+                for line_number, rows in iter_batches(
+                    file, start, batch_size
+                ):
+                    batch_inserted, batch_skipped = importer.import_batch(
+                        rows
+                    )
+                    write_checkpoint(checkpoint, line_number)
+                    inserted += batch_inserted
+                    skipped += batch_skipped
+                    rate = inserted / (time.monotonic() - started)
+                    self.stdout.write(
+                        f'Строка {line_number}: вставлено {inserted},'
+                        f' пропущено {skipped}, {rate:.0f} строк/с'
+                    )
+        except (OSError, ImportRowError) as error:
+            raise CommandError(error)
+        if os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Вставлено строк: {inserted}, пропущено: {skipped}'
+            f' за {elapsed:.1f} с ({inserted / elapsed:.0f} строк/с).'
+            f' Создано авторов: {importer.authors.created},'
+            f' категорий: {importer.categories.created},'
+            f' местоположений: {importer.locations.created}.'
+        ))
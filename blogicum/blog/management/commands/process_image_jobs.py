@@ -0,0 +1,70 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from blog.images import generate_variants
+from blog.jobs import (
+    claim_image_jobs, complete_image_job, fail_image_job,
+    get_image_job_metrics)
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+POLL_INTERVAL = 1
+
+
+class Command(BaseCommand):
+    help = (
+        'Обработчик очереди фото: создаёт уменьшенные копии загруженных'
+        ' фото постов в пуле процессов. Пока копии не готовы, посты'
+        ' выводятся с оригиналом фото.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count(),
+            help='Число процессов, обрабатывающих фото.'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Обработать готовые задания и завершиться.'
+        )
+        parser.add_argument(
+            '--stats', action='store_true',
+            help='Вывести состояние очереди и завершиться.'
+        )
+
+    def handle(self, *args, workers, once, stats, **options):
+        if stats:
+            for name, value in get_image_job_metrics().items():
+                self.stdout.write(f'{name}: {value}')
+            return
+        # Дочерние процессы не должны наследовать соединения с базой.
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            try:
+                while True:
+                    processed = self.process_batch(executor, workers * 2)
+                    if not processed:
+                        if once:
+                            break
+                        time.sleep(POLL_INTERVAL)
+            except KeyboardInterrupt:
+                self.stdout.write('Обработчик остановлен.')
+
+    def process_batch(self, executor, size):
+        jobs = claim_image_jobs(size)
+        futures = {
+            executor.submit(generate_variants, job.image): job
+            for job in jobs
+        }
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                future.result()
+            except Exception as error:
+                fail_image_job(job, f'{type(error).__name__}: {error}')
+                self.stderr.write(f'{job.image}: {error}')
+            else:
+                complete_image_job(job)
+        return len(jobs)
@@ -0,0 +1,55 @@
+from blog.models import Post
+from blog.utils import get_comment_count_subquery
+
+from django.core.management.base import BaseCommand
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = (
+        'Сверяет счётчик комментариев постов с фактическим числом'
+        ' комментариев и исправляет расхождения пакетами.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help='Количество постов, проверяемых за один запрос.'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать расхождения, ничего не исправляя.'
+        )
+
+    def handle(self, *args, batch_size, dry_run, **options):
+        checked = drifted = 0
+        last_pk = 0
+        while True:
+            batch = list(
+                Post.objects.filter(pk__gt=last_pk).order_by('pk').annotate(
+                    actual=get_comment_count_subquery()
+                ).values_list('pk', 'comment_count', 'actual')[:batch_size]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1][0]
+            checked += len(batch)
+            drifted_pks = []
+            for pk, stored, actual in batch:
+                if stored != actual:
+                    drifted_pks.append(pk)
+                    self.stdout.write(
+                        f'Пост {pk}: сохранено {stored}, фактически {actual}'
+                    )
+            drifted += len(drifted_pks)
+            if drifted_pks and not dry_run:
+                # Пересчёт в самом UPDATE не теряет комментарии,
+                # добавленные после проверки пакета.
+                Post.objects.filter(pk__in=drifted_pks).update(
+                    comment_count=get_comment_count_subquery()
+                )
+        action = 'Найдено' if dry_run else 'Исправлено'
+        self.stdout.write(self.style.SUCCESS(
+            f'Проверено постов: {checked}. {action} расхождений: {drifted}.'
+        ))
@@ -0,0 +1,84 @@
+import heapq
+import time
+
+from blog.cache import (
+    get_post_scopes, get_schedule_version, invalidate_all, invalidate_schedule,
+    invalidate_scopes)
+from blog.models import Post
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+POLL_INTERVAL = 1
+RELOAD_INTERVAL = 60
+
+
+class Command(BaseCommand):
+    help = (
+        'Планировщик отложенных публикаций: держит очередь ближайших'
+        ' публикаций и в момент публикации сбрасывает кэш главной,'
+        ' категории и профиля автора. Вместе с ним включите настройку'
+        ' PUBLICATION_SCHEDULER_ENABLED и общий для процессов бэкенд кэша.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reload-interval', type=int, default=RELOAD_INTERVAL,
+            help='Как часто (в секундах) перечитывать расписание из базы,'
+                 ' даже если сигнал об его изменении не пришёл.'
+        )
+
+    def handle(self, *args, reload_interval, **options):
+        # Пока планировщик не работал, публикации могли наступить
+        # без сброса кэша.
+        invalidate_all()
+        queue = []
+        schedule_version = None
+        reloaded_at = float('-inf')
+        try:
+            while True:
+                now = time.monotonic()
+                current_version = get_schedule_version()
+                if (
+                    current_version != schedule_version
+                    or now - reloaded_at >= reload_interval
+                ):
+                    schedule_version = current_version
+                    reloaded_at = now
+                    queue = self.load_queue()
+                self.publish_due(queue)
+                time.sleep(self.get_sleep_time(queue))
+        except KeyboardInterrupt:
+            self.stdout.write('Планировщик остановлен.')
+
+    def load_queue(self):
+        """Очередь с приоритетом (дата публикации, id поста)."""
+        queue = list(
+            Post.objects.filter(
+                is_published=True, pub_date__gt=timezone.now()
+            ).values_list('pub_date', 'pk')
+        )
+        heapq.heapify(queue)
+        return queue
+
+    def publish_due(self, queue):
+        now = timezone.now()
+        due = []
+        while queue and queue[0][0] <= now:
+            due.append(heapq.heappop(queue)[1])
+        if not due:
+            return
+        # Дату могли перенести после загрузки очереди,
+        # поэтому наступление публикации проверяется по базе.
+        posts = Post.objects.filter(pk__in=due, pub_date__lte=now)
+        invalidate_scopes(get_post_scopes(posts))
+        invalidate_schedule()
+        self.stdout.write(
+            f'{now:%Y-%m-%d %H:%M:%S}: опубликовано постов: {len(due)}'
+        )
+
+    def get_sleep_time(self, queue):
+        if not queue:
+            return POLL_INTERVAL
+        until_due = (queue[0][0] - timezone.now()).total_seconds()
+        return max(0, min(POLL_INTERVAL, until_due))
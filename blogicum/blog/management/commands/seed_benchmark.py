@@ -0,0 +1,83 @@
+from argparse import ArgumentTypeError
+
+from blog.models import User
+from blog.seeding import SEED_BATCH_SIZE, BenchmarkSeeder, get_seed_now
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.text import capfirst
+
+
+def parse_now(value):
+    now = parse_datetime(value)
+    if now is None:
+        raise ArgumentTypeError(f'Некорректная дата и время: {value}')
+    if timezone.is_naive(now):
+        now = timezone.make_aware(now)
+    return now
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу синтетическими пользователями, категориями,'
+        ' местоположениями, постами и комментариями для замеров'
+        ' производительности. При одинаковом --seed набор данных'
+        ' воспроизводится полностью.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=50)
+        parser.add_argument('--locations', type=int, default=200)
+        parser.add_argument('--posts', type=int, default=100_000)
+        parser.add_argument('--comments', type=int, default=300_000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--batch-size', type=int, default=SEED_BATCH_SIZE,
+            help='Количество объектов, создаваемых в одной транзакции.'
+        )
+        parser.add_argument(
+            '--now', type=parse_now,
+            help=(
+                'Момент, от которого отсчитываются все даты, в формате ISO'
+                ' 8601; по умолчанию начало текущих суток (UTC). Посты'
+                ' с датой публикации позже него отложены. Для повторения'
+                ' набора данных укажите момент, выведенный командой.'
+            )
+        )
+        parser.add_argument(
+            '--prefix', default='benchmark',
+            help='Префикс имён пользователей и слагов категорий.'
+        )
+
+    def handle(self, *args, seed, batch_size, prefix, now, **options):
+        counts = {
+            name: options[name]
+            for name in ('users', 'categories', 'locations', 'posts',
+                         'comments')
+        }
+        if counts['posts'] and not (counts['users'] and counts['categories']):
+            raise CommandError(
+                'Для постов нужны хотя бы один пользователь и одна категория.'
+            )
+        if counts['comments'] and not counts['posts']:
+            raise CommandError('Для комментариев нужен хотя бы один пост.')
+        if User.objects.filter(username__startswith=f'{prefix}_').exists():
+            raise CommandError(
+                f'Данные с префиксом {prefix} уже есть; укажите --prefix.'
+            )
+        now = now or get_seed_now()
+        self.stdout.write(f'Даты отсчитываются от --now={now.isoformat()}')
+        BenchmarkSeeder(
+            seed=seed, batch_size=batch_size, prefix=prefix, now=now,
+            report=self.report
+        ).seed(**counts)
+        self.stdout.write(self.style.SUCCESS('Заполнение завершено.'))
+
+    def report(self, model, count, elapsed):
+        rate = count / elapsed if elapsed else 0
+        self.stdout.write(
+            f'{capfirst(model._meta.verbose_name_plural)}: {count}'
+            f' за {elapsed:.1f} с ({rate:.0f} строк/с)'
+        )
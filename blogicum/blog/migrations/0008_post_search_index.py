@@ -0,0 +1,59 @@
+# Generated by Django 3.2.16 on 2026-10-18 18:31
+
+from django.db import migrations
+
+# Полнотекстовый индекс FTS5 по заголовку и тексту постов. Таблица
+# хранит только индекс (content='blog_post'), а триггеры поддерживают
+# его при любых изменениях постов, в том числе bulk_create и update().
+# Django пересоздаёт таблицу blog_post в SQLite при изменении её полей,
+# и триггеры при этом удаляются; их восстанавливает обработчик post_migrate
+# (см. blog.search.ensure_search_triggers).
+CREATE_SQL = (
+    """
+    CREATE VIRTUAL TABLE blog_post_search USING fts5(
+        title, text,
+        content='blog_post', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER blog_post_search_insert AFTER INSERT ON blog_post BEGIN
+        INSERT INTO blog_post_search(rowid, title, text)
+        VALUES (new.id, new.title, new.text);
+    END
+    """,
+    """
+    CREATE TRIGGER blog_post_search_delete AFTER DELETE ON blog_post BEGIN
+        INSERT INTO blog_post_search(blog_post_search, rowid, title, text)
+        VALUES ('delete', old.id, old.title, old.text);
+    END
+    """,
+    """
+    CREATE TRIGGER blog_post_search_update
+    AFTER UPDATE OF title, text ON blog_post BEGIN
+        INSERT INTO blog_post_search(blog_post_search, rowid, title, text)
+        VALUES ('delete', old.id, old.title, old.text);
+        INSERT INTO blog_post_search(rowid, title, text)
+        VALUES (new.id, new.title, new.text);
+    END
+    """,
+    "INSERT INTO blog_post_search(blog_post_search) VALUES ('rebuild')",
+)
+
+DROP_SQL = (
+    'DROP TRIGGER IF EXISTS blog_post_search_update',
+    'DROP TRIGGER IF EXISTS blog_post_search_delete',
+    'DROP TRIGGER IF EXISTS blog_post_search_insert',
+    'DROP TABLE IF EXISTS blog_post_search',
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_post_image_dimensions'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_SQL, DROP_SQL),
+    ]
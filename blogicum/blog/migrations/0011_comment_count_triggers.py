@@ -0,0 +1,57 @@
+from django.db import migrations
+
+# Счётчик комментариев поддерживают триггеры blog_comment, а не сигналы:
+# обработчик post_delete у Comment отключает быстрое каскадное удаление,
+# и удаление поста с тысячами комментариев стоило бы тысяч запросов.
+# Триггеры удаляются, когда Django пересоздаёт таблицу blog_comment;
+# их восстанавливает обработчик post_migrate
+# (см. blog.utils.ensure_comment_count_triggers).
+CREATE_SQL = (
+    """
+    CREATE TRIGGER blog_comment_count_insert
+    AFTER INSERT ON blog_comment BEGIN
+        UPDATE blog_post SET comment_count = comment_count + 1
+        WHERE id = new.post_id;
+    END
+    """,
+    """
+    CREATE TRIGGER blog_comment_count_delete
+    AFTER DELETE ON blog_comment BEGIN
+        UPDATE blog_post SET comment_count = max(comment_count - 1, 0)
+        WHERE id = old.post_id;
+    END
+    """,
+    """
+    CREATE TRIGGER blog_comment_count_update
+    AFTER UPDATE OF post_id ON blog_comment
+    WHEN old.post_id != new.post_id BEGIN
+        UPDATE blog_post SET comment_count = max(comment_count - 1, 0)
+        WHERE id = old.post_id;
+        UPDATE blog_post SET comment_count = comment_count + 1
+        WHERE id = new.post_id;
+    END
+    """,
+    """
+    UPDATE blog_post SET comment_count = (
+        SELECT COUNT(*) FROM blog_comment
+        WHERE blog_comment.post_id = blog_post.id
+    )
+    """,
+)
+
+DROP_SQL = (
+    'DROP TRIGGER IF EXISTS blog_comment_count_update',
+    'DROP TRIGGER IF EXISTS blog_comment_count_delete',
+    'DROP TRIGGER IF EXISTS blog_comment_count_insert',
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_post_feed_index_category'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_SQL, DROP_SQL),
+    ]
@@ -1,9 +1,22 @@
+import hashlib
+
 from django.urls import reverse
 from blog.models import Comment, Post
+from blog.cache import (
+    get_cache_timeout, get_generation, get_list_last_modified,
+    get_page_cache_key, get_post_count_key)
+from blog.pagination import CachedCountPaginator, paginate_by_cursor
+from core.constants import (
+    POST_CARD_CACHE_TIMEOUT, POST_PAGE_CACHE_TIMEOUT, POSTS_ON_PAGE)
 
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.cache import cache
 from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse
 from django.shortcuts import get_object_or_404, redirect
+from django.template.response import TemplateResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
 
 
 class PostChangeMixin(LoginRequiredMixin):
@@ -16,11 +29,15 @@ class PostChangeMixin(LoginRequiredMixin):
     pk_url_kwarg = 'post_id'
 
     def dispatch(self, request, *args, **kwargs):
-        instance = get_object_or_404(Post, pk=kwargs['post_id'])
-        if instance.author != request.user:
-            return redirect(instance)
+        self.post_object = get_object_or_404(Post, pk=kwargs['post_id'])
+        if self.post_object.author_id != request.user.pk:
+            return redirect(self.post_object)
         return super().dispatch(request, *args, **kwargs)
 
+    def get_object(self, queryset=None):
+        # Пост уже загружен в dispatch() при проверке авторства.
+        return self.post_object
+
 
 class CommentMixin:
     """Миксин с общими аттрибутами CBV для обработки комментариев."""
@@ -52,3 +69,155 @@ class ProfileRedirectMixin(LoginRequiredMixin):
             'blog:profile',
             kwargs={'author': self.request.user.username}
         )
+
+
+class ConditionalGetMixin:
+    """Миксин, отвечающий 304 Not Modified на условные GET-запросы.
+
+    Валидаторы (ETag и время изменения) возвращает get_validators();
+    они должны вычисляться без отрисовки шаблона. Представления без
+    get() у родителя вызывают conditional_response() из своего get().
+    """
+
+    def get_validators(self):
+        raise NotImplementedError(
+            'Определите get_validators() в представлении.'
+        )
+
+    def get_etag(self, *parts):
+        parts += (self.request.user.pk,)
+        return quote_etag(
+            hashlib.md5(':'.join(map(str, parts)).encode()).hexdigest()
+        )
+
+    def get(self, request, *args, **kwargs):
+        return self.conditional_response(
+            request, lambda: super(ConditionalGetMixin, self).get(
+                request, *args, **kwargs
+            )
+        )
+
+    def conditional_response(self, request, render):
+        """Ответ 304 по валидаторам или render() с их заголовками."""
+        etag, last_modified = self.get_validators()
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = render()
+        if etag is not None and not response.has_header('ETag'):
+            response['ETag'] = etag
+        if last_modified is not None and not response.has_header(
+            'Last-Modified'
+        ):
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+
+class AnonymousPageCacheMixin:
+    """Миксин, кэширующий страницы для анонимных пользователей целиком
+    по области видимости get_cache_scope() и номеру страницы.
+
+    Вместе со страницей сохраняются её заголовки ETag и Last-Modified,
+    поэтому при попадании в кэш валидаторы не вычисляются заново:
+    миксин должен стоять в MRO раньше ConditionalGetMixin.
+    """
+
+    page_kwarg = 'page'
+    cursor_kwarg = 'cursor'
+
+    def get_cache_scope(self):
+        raise NotImplementedError(
+            'Определите get_cache_scope() в представлении списка постов.'
+        )
+
+    def get(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return super().get(request, *args, **kwargs)
+        cache_key = get_page_cache_key(
+            self.get_cache_scope(),
+            '{}?{}={}&{}={}'.format(
+                request.path,
+                self.page_kwarg, request.GET.get(self.page_kwarg, ''),
+                self.cursor_kwarg, request.GET.get(self.cursor_kwarg, '')
+            )
+        )
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return self.get_cached_response(request, *cached)
+        response = super().get(request, *args, **kwargs)
+        if isinstance(response, TemplateResponse):
+            response.add_post_render_callback(
+                lambda response: cache.set(
+                    cache_key,
+                    (
+                        response.content,
+                        response.get('ETag'),
+                        response.get('Last-Modified'),
+                    ),
+                    get_cache_timeout(POST_PAGE_CACHE_TIMEOUT)
+                )
+            )
+        return response
+
+    def get_cached_response(self, request, content, etag, last_modified):
+        response = get_conditional_response(
+            request, etag=etag,
+            last_modified=(
+                parse_http_date_safe(last_modified) if last_modified else None
+            )
+        )
+        if response is None:
+            response = HttpResponse(content)
+        if etag is not None:
+            response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = last_modified
+        return response
+
+
+class PostListMixin(AnonymousPageCacheMixin, ConditionalGetMixin):
+    """Миксин для списков постов с двумя режимами пагинации.
+
+    По умолчанию работает обычная постраничная навигация (?page=N).
+    Параметр ?cursor=<токен> включает курсорный режим: страницы
+    выбираются по (pub_date, id) без OFFSET и подсчёта общего числа постов.
+
+    Общее число постов кэшируется по области видимости, которую
+    возвращает get_cache_scope(), отрисованные карточки постов — по id
+    поста и времени его изменения. Время изменения списка — позднейшее
+    из времени сброса кэша области и даты последней видимой публикации
+    (без планировщика публикаций).
+    """
+
+    paginate_by = POSTS_ON_PAGE
+    paginator_class = CachedCountPaginator
+
+    def get_validators(self):
+        scope = self.get_cache_scope()
+        last_modified = get_list_last_modified(scope, self.get_queryset())
+        return (
+            self.get_etag(scope, last_modified, self.request.get_full_path()),
+            int(last_modified)
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['card_cache_timeout'] = POST_CARD_CACHE_TIMEOUT
+        context['card_generation'] = get_generation()
+        return context
+
+    def get_paginator(self, *args, **kwargs):
+        return super().get_paginator(
+            *args,
+            count_cache_key=get_post_count_key(self.get_cache_scope()),
+            **kwargs
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.cursor_kwarg not in self.request.GET:
+            return super().paginate_queryset(queryset, page_size)
+        page = paginate_by_cursor(
+            queryset, self.request.GET[self.cursor_kwarg], page_size
+        )
+        return None, page, page.object_list, page.has_other_pages()
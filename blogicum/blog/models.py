@@ -1,9 +1,11 @@
+from blog.registry import RegistryModelIterable
 from core.models import CreatedAt, IsPublishedCreatedAt
 from core.constants import FIELD_TEXT_LIMIT, TITLE_LIMIT, SLUG_LIMIT
 
 from django.contrib.auth import get_user_model
 from django.db import models
 from django.urls import reverse
+from django.utils import timezone
 
 
 User = get_user_model()
@@ -44,6 +46,17 @@ class Location(IsPublishedCreatedAt):
         return self.name[:TITLE_LIMIT]
 
 
+class PostQuerySet(models.QuerySet):
+
+    def with_registry(self):
+        """Берёт категории и местоположения постов из реестра процесса
+        вместо присоединения таблиц в запросе.
+        """
+        clone = self._chain()
+        clone._iterable_class = RegistryModelIterable
+        return clone
+
+
 class Post(IsPublishedCreatedAt):
     """Модель публикаций."""
 
@@ -74,12 +87,58 @@ class Post(IsPublishedCreatedAt):
         verbose_name='Категория'
     )
     image = models.ImageField('Фото', upload_to='posts_images', blank=True)
+    # Размеры заполняются сигналом при загрузке фото (см. blog.signals),
+    # а не через width_field/height_field, которые перечитывают файл при
+    # каждой загрузке поста с незаполненными размерами. Исходники бывают
+    # больше 32767 пикселей, поэтому поля не SmallInteger.
+    image_width = models.PositiveIntegerField(
+        'Ширина фото',
+        null=True,
+        blank=True,
+        editable=False
+    )
+    image_height = models.PositiveIntegerField(
+        'Высота фото',
+        null=True,
+        blank=True,
+        editable=False
+    )
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False
+    )
+    updated_at = models.DateTimeField(
+        'Изменено',
+        help_text='Время последнего изменения поста или его комментариев.',
+        auto_now=True
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         default_related_name = 'posts'
         ordering = ['-pub_date']
+        indexes = (
+            # category в конце индекса: фильтр гостей по скрытым
+            # категориям и подсчёт постов обходятся без чтения таблицы.
+            models.Index(
+                fields=('-pub_date', '-id', 'category'),
+                condition=models.Q(is_published=True),
+                name='post_published_feed_idx',
+            ),
+            models.Index(
+                fields=('category', '-pub_date', '-id'),
+                condition=models.Q(is_published=True),
+                name='post_published_category_idx',
+            ),
+            models.Index(
+                fields=('author', '-pub_date', '-id'),
+                name='post_author_feed_idx',
+            ),
+        )
 
     def __str__(self):
         return self.title[:TITLE_LIMIT]
@@ -90,9 +149,6 @@ class Post(IsPublishedCreatedAt):
             kwargs={'post_id': self.pk}
         )
 
-    def comment_count(self):
-        return Comment.objects.filter(post=self.pk).count()
-
 
 class Comment(CreatedAt):
     """Модель комментариев к публикациям."""
@@ -115,9 +171,65 @@ class Comment(CreatedAt):
         verbose_name_plural = 'комментарии'
         ordering = ('created_at',)
         default_related_name = 'comments'
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at', 'id'),
+                name='comment_post_thread_idx',
+            ),
+        )
 
     def get_absolute_url(self):
         return reverse(
             'blog:post_detail',
-            kwargs={'post_id': self.post.pk}
+            kwargs={'post_id': self.post_id}
+        )
+
+
+class ImageJob(CreatedAt):
+    """Задание на создание уменьшенных копий фото поста.
+
+    Очередь хранится в базе и разбирается командой process_image_jobs.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'В очереди'
+        RUNNING = 'running', 'Обрабатывается'
+        DONE = 'done', 'Готово'
+        FAILED = 'failed', 'Ошибка'
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        verbose_name='Публикация'
+    )
+    image = models.CharField('Файл фото', max_length=FIELD_TEXT_LIMIT)
+    status = models.CharField(
+        'Состояние',
+        max_length=16,
+        choices=Status.choices,
+        default=Status.PENDING
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    available_at = models.DateTimeField(
+        'Доступно с',
+        help_text='Время, раньше которого задание не будет взято в работу.',
+        default=timezone.now
+    )
+    started_at = models.DateTimeField('Начато', null=True, blank=True)
+    finished_at = models.DateTimeField('Завершено', null=True, blank=True)
+    error = models.TextField('Последняя ошибка', blank=True)
+
+    class Meta:
+        verbose_name = 'обработка фото'
+        verbose_name_plural = 'Обработка фото'
+        ordering = ('available_at', 'id')
+        default_related_name = 'image_jobs'
+        indexes = (
+            models.Index(
+                fields=('status', 'available_at', 'id'),
+                name='image_job_queue_idx',
+            ),
         )
+
+    def __str__(self):
+        return f'{self.image} ({self.get_status_display()})'
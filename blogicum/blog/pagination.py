@@ -0,0 +1,213 @@
+import base64
+import binascii
+import math
+from datetime import datetime
+
+from blog.cache import get_cache_timeout
+from core.constants import PAGINATOR_WINDOW, POST_COUNT_CACHE_TIMEOUT
+
+from django.core.cache import cache
+from django.core.paginator import Page, Paginator
+from django.db.models import Q
+from django.http import Http404
+from django.utils.functional import cached_property
+
+CURSOR_ORDERING = ('-pub_date', '-pk')
+# Наибольший первичный ключ SQLite; больший id из токена не поместился
+# бы в параметр запроса (OverflowError).
+MAX_PK = 2 ** 63 - 1
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+def encode_cursor(direction, position, pk):
+    """Упаковывает позицию объекта в непрозрачный токен для URL.
+
+    Позиция — дата (например, pub_date) или число (ранг в поиске).
+    """
+    if isinstance(position, datetime):
+        position = position.isoformat()
+    raw = f'{direction}|{position}|{pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, position_type=datetime):
+    """Распаковывает токен в направление, позицию и id объекта.
+
+    position_type — тип позиции: datetime или float. Даты без часового
+    пояса, нечисловые ранги и id вне диапазона ключей отклоняются:
+    такие токены приложение не выдаёт.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(
+            cursor + '=' * (-len(cursor) % 4)
+        ).decode()
+        direction, position, pk = raw.split('|')
+        if direction not in (NEXT, PREVIOUS):
+            raise ValueError
+        if position_type is datetime:
+            position = datetime.fromisoformat(position)
+            if position.utcoffset() is None:
+                raise ValueError
+        else:
+            position = position_type(position)
+            if not math.isfinite(position):
+                raise ValueError
+        pk = int(pk)
+        if not 0 < pk <= MAX_PK:
+            raise ValueError
+        return direction, position, pk
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise Http404('Неверный курсор страницы.')
+
+
+class CursorPage:
+    """Страница курсорной пагинации.
+
+    Повторяет ту часть интерфейса django.core.paginator.Page,
+    которая нужна шаблонам, но не знает общего числа объектов.
+    """
+
+    is_cursor = True
+
+    def __init__(
+            self, object_list, has_next, has_previous,
+            position_field='pub_date'
+    ):
+        self.object_list = object_list
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self.position_field = position_field
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if self._has_next:
+            return self._encode(NEXT, self.object_list[-1])
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self._has_previous:
+            return self._encode(PREVIOUS, self.object_list[0])
+        return None
+
+    def _encode(self, direction, obj):
+        # Страница может состоять из словарей, выбранных через values().
+        if isinstance(obj, dict):
+            return encode_cursor(
+                direction, obj[self.position_field], obj['id']
+            )
+        return encode_cursor(
+            direction, getattr(obj, self.position_field), obj.pk
+        )
+
+
+def paginate_by_cursor(queryset, cursor, per_page):
+    """Возвращает страницу постов после (или до) позиции из курсора.
+
+    Посты упорядочены по (pub_date, id) от новых к старым, поэтому
+    выборка страницы — это сравнение по индексу без OFFSET и COUNT(*).
+    Пустой курсор соответствует первой странице.
+    """
+    if not cursor:
+        posts = list(queryset.order_by(*CURSOR_ORDERING)[:per_page + 1])
+        return CursorPage(posts[:per_page], len(posts) > per_page, False)
+    direction, pub_date, pk = decode_cursor(cursor)
+    if direction == NEXT:
+        posts = list(
+            queryset.filter(
+                Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, pk__lt=pk)
+            ).order_by(*CURSOR_ORDERING)[:per_page + 1]
+        )
+        return CursorPage(posts[:per_page], len(posts) > per_page, True)
+    posts = list(
+        queryset.filter(
+            Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, pk__gt=pk)
+        ).order_by('pub_date', 'pk')[:per_page + 1]
+    )
+    return CursorPage(
+        posts[:per_page][::-1], True, len(posts) > per_page
+    )
+
+
+def paginate_forward(
+        queryset, cursor, per_page, position_field, position_type=datetime
+):
+    """Возвращает страницу объектов, следующих за позицией курсора,
+    в порядке возрастания (position_field, id). Пустой курсор
+    соответствует первой странице.
+    """
+    queryset = queryset.order_by(position_field, 'pk')
+    if cursor:
+        direction, position, pk = decode_cursor(cursor, position_type)
+        if direction != NEXT:
+            raise Http404('Неверный курсор страницы.')
+        queryset = queryset.filter(
+            Q(**{f'{position_field}__gt': position})
+            | Q(**{position_field: position, 'pk__gt': pk})
+        )
+    objects = list(queryset[:per_page + 1])
+    return CursorPage(
+        objects[:per_page], len(objects) > per_page, False,
+        position_field=position_field
+    )
+
+
+def paginate_comments(queryset, cursor, per_page):
+    """Возвращает страницу комментариев, следующих за позицией курсора,
+    в порядке добавления. Пустой курсор соответствует первой странице.
+    """
+    return paginate_forward(queryset, cursor, per_page, 'created_at')
+
+
+class WindowedPage(Page):
+    """Страница, которая отдаёт шаблону только ближайшие номера страниц."""
+
+    @property
+    def page_window(self):
+        return range(
+            max(1, self.number - PAGINATOR_WINDOW),
+            min(self.paginator.num_pages, self.number + PAGINATOR_WINDOW) + 1
+        )
+
+
+class CachedCountPaginator(Paginator):
+    """Пагинатор, который берёт общее число объектов из кэша.
+
+    Если count_cache_key не задан, работает как обычный Paginator.
+    """
+
+    def __init__(self, *args, count_cache_key=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.count_cache_key = count_cache_key
+
+    @cached_property
+    def count(self):
+        if self.count_cache_key is None:
+            return super().count
+        count = cache.get(self.count_cache_key)
+        if count is None:
+            count = super().count
+            cache.set(
+                self.count_cache_key, count,
+                get_cache_timeout(POST_COUNT_CACHE_TIMEOUT)
+            )
+        return count
+
+    def _get_page(self, *args, **kwargs):
+        return WindowedPage(*args, **kwargs)
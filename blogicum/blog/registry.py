@@ -0,0 +1,106 @@
+import threading
+import time
+import uuid
+
+from core.constants import REGISTRY_MAX_AGE
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db.models.query import ModelIterable
+
+REGISTRY_VERSION_KEY = 'blog:registry'
+
+_lock = threading.Lock()
+_registry = None
+
+
+class Registry:
+    """Снимок таблиц категорий и местоположений в памяти процесса.
+
+    Таблицы маленькие и меняются редко, поэтому списки постов берут
+    категории и местоположения отсюда, а не присоединяют их в запросе.
+    """
+
+    def __init__(self, version):
+        Category = apps.get_model('blog', 'Category')
+        Location = apps.get_model('blog', 'Location')
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self.categories = {
+            category.pk: category for category in Category.objects.all()
+        }
+        self.categories_by_slug = {
+            category.slug: category for category in self.categories.values()
+        }
+        self.locations = {
+            location.pk: location for location in Location.objects.all()
+        }
+        self.published_category_ids = frozenset(
+            pk for pk, category in self.categories.items()
+            if category.is_published
+        )
+        self.unpublished_category_ids = frozenset(
+            self.categories.keys() - self.published_category_ids
+        )
+
+    def is_stale(self, version):
+        return (
+            self.version != version
+            or time.monotonic() - self.loaded_at > REGISTRY_MAX_AGE
+        )
+
+    def get_published_category(self, slug):
+        category = self.categories_by_slug.get(slug)
+        if category is None or not category.is_published:
+            return None
+        return category
+
+    def attach(self, post):
+        """Подставляет посту категорию и местоположение без запросов."""
+        for field_name, objects in (
+            ('category', self.categories), ('location', self.locations)
+        ):
+            field = post._meta.get_field(field_name)
+            related_id = getattr(post, field.attname)
+            if related_id is None:
+                field.set_cached_value(post, None)
+            elif related_id in objects:
+                field.set_cached_value(post, objects[related_id])
+
+
+def get_registry():
+    """Возвращает реестр, перечитывая его, если категории или
+    местоположения изменились (проверяется версия в общем кэше).
+
+    Если кэш не общий для процессов, версия сбрасывается только там,
+    где изменили категорию; тогда реестр остальных процессов
+    перечитывается по истечении REGISTRY_MAX_AGE.
+    """
+    global _registry
+    version = cache.get_or_set(REGISTRY_VERSION_KEY, _new_version, None)
+    registry = _registry
+    if registry is None or registry.is_stale(version):
+        with _lock:
+            if _registry is None or _registry.is_stale(version):
+                _registry = Registry(version)
+            registry = _registry
+    return registry
+
+
+def invalidate_registry():
+    """Помечает реестры всех процессов устаревшими."""
+    cache.set(REGISTRY_VERSION_KEY, _new_version(), None)
+
+
+class RegistryModelIterable(ModelIterable):
+    """Итератор QuerySet, подставляющий объектам данные из реестра."""
+
+    def __iter__(self):
+        registry = get_registry()
+        for obj in super().__iter__():
+            registry.attach(obj)
+            yield obj
+
+
+def _new_version():
+    return uuid.uuid4().hex
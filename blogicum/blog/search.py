@@ -0,0 +1,110 @@
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import FloatField, Value
+from django.db.models.expressions import RawSQL
+
+SEARCH_TABLE = 'blog_post_search'
+# Заголовок весит больше текста при ранжировании.
+TITLE_WEIGHT = 10.0
+TEXT_WEIGHT = 1.0
+MAX_TERMS = 10
+# Триггеры, поддерживающие индекс при любых изменениях постов,
+# в том числе bulk_create и update(). Совпадают с созданными
+# миграцией 0008_post_search_index.
+SEARCH_TRIGGERS = {
+    'blog_post_search_insert': '''
+        CREATE TRIGGER IF NOT EXISTS blog_post_search_insert
+        AFTER INSERT ON blog_post BEGIN
+            INSERT INTO blog_post_search(rowid, title, text)
+            VALUES (new.id, new.title, new.text);
+        END
+    ''',
+    'blog_post_search_delete': '''
+        CREATE TRIGGER IF NOT EXISTS blog_post_search_delete
+        AFTER DELETE ON blog_post BEGIN
+            INSERT INTO blog_post_search(blog_post_search, rowid, title, text)
+            VALUES ('delete', old.id, old.title, old.text);
+        END
+    ''',
+    'blog_post_search_update': '''
+        CREATE TRIGGER IF NOT EXISTS blog_post_search_update
+        AFTER UPDATE OF title, text ON blog_post BEGIN
+            INSERT INTO blog_post_search(blog_post_search, rowid, title, text)
+            VALUES ('delete', old.id, old.title, old.text);
+            INSERT INTO blog_post_search(rowid, title, text)
+            VALUES (new.id, new.title, new.text);
+        END
+    ''',
+}
+
+
+def build_match_query(query):
+    """Переводит строку поиска в запрос FTS5.
+
+    Каждое слово ищется как префикс, все слова должны встретиться
+    в посте. Синтаксис FTS5 в строке пользователя не действует.
+    """
+    terms = re.findall(r'\w+', query)[:MAX_TERMS]
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def search_posts(queryset, query):
+    """Посты из queryset, найденные по строке query, с рангом
+    релевантности search_rank (чем меньше, тем выше в выдаче).
+
+    Фильтры видимости queryset (см. get_valid_posts) сохраняются.
+    """
+    match = build_match_query(query)
+    if not match:
+        # Пустой результат тоже несёт search_rank: по нему сортирует
+        # курсорная пагинация.
+        return queryset.none().annotate(
+            search_rank=Value(0.0, output_field=FloatField())
+        )
+    return queryset.filter(
+        pk__in=RawSQL(
+            f'SELECT rowid FROM {SEARCH_TABLE}'
+            f' WHERE {SEARCH_TABLE} MATCH %s',
+            (match,)
+        )
+    ).annotate(
+        search_rank=RawSQL(
+            f'SELECT bm25({SEARCH_TABLE}, %s, %s) FROM {SEARCH_TABLE}'
+            f' WHERE {SEARCH_TABLE} MATCH %s'
+            f' AND rowid = {queryset.model._meta.db_table}.id',
+            (TITLE_WEIGHT, TEXT_WEIGHT, match),
+            output_field=FloatField()
+        )
+    )
+
+
+def ensure_search_triggers(using=DEFAULT_DB_ALIAS):
+    """Создаёт недостающие триггеры индекса поиска.
+
+    SQLite удаляет триггеры, когда Django пересоздаёт таблицу blog_post
+    при изменении её полей. Если триггеров не было, индекс мог отстать
+    от таблицы, поэтому он перестраивается. Возвращает имена созданных
+    триггеров.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master"
+            " WHERE type IN ('table', 'trigger') AND name LIKE %s",
+            (f'{SEARCH_TABLE}%',)
+        )
+        existing = {name for name, in cursor.fetchall()}
+        if SEARCH_TABLE not in existing:
+            return []
+        missing = [name for name in SEARCH_TRIGGERS if name not in existing]
+        for name in missing:
+            cursor.execute(SEARCH_TRIGGERS[name])
+        if missing:
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE})"
+                " VALUES ('rebuild')"
+            )
+    return missing
@@ -0,0 +1,203 @@
+import random
+import time
+from array import array
+from contextlib import nullcontext
+from datetime import datetime, timedelta, timezone
+
+from blog.cache import invalidate_all
+from blog.models import Category, Comment, Location, Post, User
+from blog.registry import invalidate_registry
+from blog.utils import keep_created_at
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from faker import Faker
+
+SEED_BATCH_SIZE = 5000
+# Тексты берутся из заранее созданных наборов: генерация Faker
+# на каждую строку заняла бы большую часть времени заполнения.
+TEXT_POOL_SIZE = 1000
+UNPUBLISHED_CATEGORY_SHARE = 0.1
+UNPUBLISHED_POST_SHARE = 0.05
+FUTURE_POST_SHARE = 0.02
+POST_WITHOUT_LOCATION_SHARE = 0.3
+MAX_POST_AGE = timedelta(days=5 * 365)
+MEAN_POST_AGE = timedelta(days=365)
+MAX_FUTURE_DELAY = timedelta(days=30)
+
+
+def get_seed_now():
+    """Момент отсчёта дат по умолчанию — начало текущих суток (UTC).
+
+    Отложенные посты остаются в будущем относительно реального
+    времени, а запуски в течение суток дают одинаковые даты.
+    """
+    return datetime.now(timezone.utc).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+
+
+class BenchmarkSeeder:
+    """Заполняет базу синтетическими данными для замеров
+    производительности.
+
+    Объекты создаются через bulk_create пакетами по batch_size,
+    каждый пакет — в своей транзакции. При одинаковом seed набор
+    данных воспроизводится полностью, включая даты: они отсчитываются
+    от now (по умолчанию get_seed_now()).
+    """
+
+    def __init__(self, seed=0, batch_size=SEED_BATCH_SIZE,
+                 prefix='benchmark', report=None, now=None):
+        self.random = random.Random(seed)
+        self.fake = Faker('ru_RU')
+        self.fake.seed_instance(seed)
+        self.batch_size = batch_size
+        self.prefix = prefix
+        self.report = report
+        self.now = now or get_seed_now()
+        self.first_date = self.now - MAX_POST_AGE
+        self.titles = [
+            self.fake.sentence(nb_words=5)[:-1]
+            for _ in range(TEXT_POOL_SIZE)
+        ]
+        self.texts = [
+            self.fake.paragraph(nb_sentences=8)
+            for _ in range(TEXT_POOL_SIZE)
+        ]
+        self.comments = [
+            self.fake.sentence(nb_words=12) for _ in range(TEXT_POOL_SIZE)
+        ]
+        # Ключи созданных объектов; array занимает 8 байт на ключ.
+        self.user_pks = array('q')
+        self.category_pks = array('q')
+        self.location_pks = array('q')
+        self.post_pks = array('q')
+        # Время создания постов (timestamp) в порядке их ключей:
+        # комментарии к посту появляются после него.
+        self.post_created = array('d')
+
+    def seed(self, users, categories, locations, posts, comments):
+        self.create_users(users)
+        self.create_categories(categories)
+        self.create_locations(locations)
+        self.create_posts(posts)
+        self.create_comments(comments)
+        # bulk_create не отправляет сигналы, поэтому кэш блога
+        # и реестр категорий сбрасываются вручную.
+        invalidate_all()
+        invalidate_registry()
+
+    def create_users(self, count):
+        # Общий непригодный для входа пароль: хеширование на каждого
+        # пользователя замедлило бы заполнение в разы.
+        password = make_password(None)
+        self._create(User, count, self.user_pks, lambda i: User(
+            username=f'{self.prefix}_{i}',
+            first_name=self.fake.first_name(),
+            last_name=self.fake.last_name(),
+            password=password,
+            date_joined=self.get_date_between(self.first_date, self.now),
+        ))
+
+    def create_categories(self, count):
+        self._create(Category, count, self.category_pks, lambda i: Category(
+            title=self.fake.word().capitalize(),
+            description=self.random.choice(self.comments),
+            slug=f'{self.prefix}-{i}',
+            is_published=(
+                self.random.random() >= UNPUBLISHED_CATEGORY_SHARE
+            ),
+            created_at=self.first_date,
+        ))
+
+    def create_locations(self, count):
+        self._create(Location, count, self.location_pks, lambda i: Location(
+            name=self.fake.city(),
+            created_at=self.first_date,
+        ))
+
+    def create_posts(self, count):
+        self._create(Post, count, self.post_pks, self.build_post)
+
+    def build_post(self, i):
+        pub_date = self.get_pub_date()
+        # Отложенный пост создан до наступления даты публикации.
+        created_at = min(pub_date, self.now)
+        self.post_created.append(created_at.timestamp())
+        return Post(
+            title=self.random.choice(self.titles),
+            text=self.random.choice(self.texts),
+            pub_date=pub_date,
+            created_at=created_at,
+            updated_at=created_at,
+            is_published=self.random.random() >= UNPUBLISHED_POST_SHARE,
+            author_id=self.random.choice(self.user_pks),
+            category_id=self.random.choice(self.category_pks),
+            location_id=(
+                self.random.choice(self.location_pks)
+                if self.location_pks
+                and self.random.random() >= POST_WITHOUT_LOCATION_SHARE
+                else None
+            ),
+        )
+
+    def create_comments(self, count):
+        post_count = len(self.post_pks)
+        # Комментарии распределены неравномерно: у немногих постов их
+        # много, у большинства — единицы или ни одного.
+        self._create(Comment, count, None, lambda i: self.build_comment(
+            int(post_count * self.random.random() ** 3)
+        ))
+
+    def build_comment(self, index):
+        post_created = datetime.fromtimestamp(
+            self.post_created[index], timezone.utc
+        )
+        return Comment(
+            post_id=self.post_pks[index],
+            author_id=self.random.choice(self.user_pks),
+            text=self.random.choice(self.comments),
+            created_at=self.get_date_between(post_created, self.now),
+        )
+
+    def get_pub_date(self):
+        """Дата публикации: чем новее, тем больше постов;
+        небольшая доля отложена на будущее.
+        """
+        if self.random.random() < FUTURE_POST_SHARE:
+            return self.now + MAX_FUTURE_DELAY * self.random.random()
+        age = min(
+            self.random.expovariate(1) * MEAN_POST_AGE, MAX_POST_AGE
+        )
+        return self.now - age
+
+    def get_date_between(self, start, end):
+        return start + (end - start) * self.random.random()
+
+    @staticmethod
+    def _keep_dates(model):
+        if model is User:
+            return nullcontext()
+        if model is Post:
+            return keep_created_at(Post, ('created_at', 'updated_at'))
+        return keep_created_at(model)
+
+    def _create(self, model, count, pks, build):
+        started = time.monotonic()
+        last_pk = model.objects.order_by('-pk').values_list(
+            'pk', flat=True
+        ).first() or 0
+        for start in range(0, count, self.batch_size):
+            with transaction.atomic(), self._keep_dates(model):
+                model.objects.bulk_create(
+                    build(i)
+                    for i in range(start, min(start + self.batch_size, count))
+                )
+        if pks is not None:
+            # SQLite не возвращает ключи из bulk_create: перечитываем их.
+            pks.extend(model.objects.filter(pk__gt=last_pk).order_by(
+                'pk'
+            ).values_list('pk', flat=True).iterator())
+        if self.report is not None and count:
+            self.report(model, count, time.monotonic() - started)
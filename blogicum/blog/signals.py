@@ -0,0 +1,142 @@
+from blog.cache import (
+    get_post_scopes, get_sitemap_scope, get_sitemap_shard, invalidate_all,
+    invalidate_schedule, invalidate_scopes)
+from blog.images import get_dimensions
+from blog.jobs import enqueue_image_job
+from blog.models import Category, Comment, Location, Post, User
+from blog.registry import invalidate_registry
+from blog.search import ensure_search_triggers
+from blog.utils import ensure_comment_count_triggers, touch_posts
+
+from django.db.models.signals import (
+    post_delete, post_migrate, post_save, pre_delete, pre_save)
+from django.dispatch import receiver
+from django.utils import timezone
+
+
+@receiver(post_save, sender=Comment)
+def update_post_on_comment_save(
+        sender, instance, created, raw=False, **kwargs
+):
+    """Отмечает пост изменённым при сохранении комментария. Счётчик
+    комментариев поддерживают триггеры базы (миграция
+    0011_comment_count_triggers).
+
+    Обработчика удаления комментариев нет намеренно: он отключил бы
+    быстрое каскадное удаление. Удаление отдельного комментария
+    обрабатывают представление и админка (см. touch_posts).
+    """
+    if raw:
+        return
+    if created:
+        touch_posts([instance.post_id])
+    else:
+        Post.objects.filter(pk=instance.post_id).update(
+            updated_at=timezone.now()
+        )
+
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_delete, sender=Post)
+def remember_post_scopes(sender, instance, raw=False, **kwargs):
+    """Запоминает области видимости, в которых пост выводился
+    до изменения, чтобы сбросить и те, откуда он ушёл.
+    """
+    if instance.pk is None or raw:
+        instance._previous_scopes = []
+        return
+    instance._previous_scopes = get_post_scopes(
+        Post.objects.filter(pk=instance.pk)
+    )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_scopes(sender, instance, **kwargs):
+    """Сбрасывает закэшированные числа постов и страницы
+    в областях видимости поста до и после изменения.
+    """
+    invalidate_scopes(
+        getattr(instance, '_previous_scopes', [])
+        + get_post_scopes(Post.objects.filter(pk=instance.pk))
+    )
+    invalidate_schedule()
+
+
+@receiver(pre_save, sender=Post)
+def remember_new_image(sender, instance, raw=False, **kwargs):
+    """Отмечает, что к посту загружено новое фото (файл ещё
+    не сохранён в хранилище), и запоминает размеры фото.
+    """
+    instance._image_uploaded = (
+        not raw and bool(instance.image) and not instance.image._committed
+    )
+    if instance._image_uploaded:
+        instance.image_width, instance.image_height = get_dimensions(
+            instance.image
+        )
+    elif not instance.image:
+        instance.image_width = instance.image_height = None
+
+
+@receiver(post_save, sender=Post)
+def enqueue_image_variants(sender, instance, **kwargs):
+    """Ставит в очередь создание уменьшенных копий только что
+    загруженного фото, чтобы не занимать им обработку запроса.
+    """
+    if getattr(instance, '_image_uploaded', False):
+        enqueue_image_job(instance)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_on_related_change(sender, **kwargs):
+    """Публикация категории меняет видимость всех её постов,
+    а категории и местоположения выводятся в карточках постов,
+    поэтому кэш блога сбрасывается целиком, как и реестр.
+    """
+    invalidate_all()
+    invalidate_registry()
+
+
+@receiver(post_save, sender=User)
+def invalidate_on_user_change(
+        sender, instance, created, update_fields=None, **kwargs
+):
+    """Имя автора выводится в карточках и адресах профилей, а активные
+    пользователи — в карте сайта. Сохранения, не затрагивающие ни имя,
+    ни активность (например, время входа), пропускаются.
+    """
+    if created or update_fields is None or 'is_active' in update_fields:
+        invalidate_scopes(
+            [get_sitemap_scope('authors', get_sitemap_shard(instance.pk))]
+        )
+    if created:
+        return
+    if update_fields is None or 'username' in update_fields:
+        invalidate_all()
+
+
+@receiver(post_delete, sender=User)
+def invalidate_on_user_delete(sender, instance, **kwargs):
+    """Сбрасывает кэш блога целиком: иначе закэшированный автор
+    продолжал бы отдавать профиль и его ленты, а новый пользователь
+    с тем же именем получил бы чужой pk. Каскадно удалённые
+    комментарии меняют счётчики постов других авторов.
+    """
+    invalidate_scopes(
+        [get_sitemap_scope('authors', get_sitemap_shard(instance.pk))]
+    )
+    invalidate_all()
+
+
+@receiver(post_migrate)
+def restore_triggers(sender, using, **kwargs):
+    """Восстанавливает триггеры поиска и счётчика комментариев,
+    удалённые миграциями, которые пересоздают таблицы.
+    """
+    if sender.name == 'blog':
+        ensure_search_triggers(using)
+        ensure_comment_count_triggers(using)
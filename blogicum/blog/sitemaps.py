@@ -0,0 +1,143 @@
+from datetime import datetime, timezone as dt_timezone
+
+from blog.cache import (
+    get_cache_timeout, get_last_modified, get_page_cache_key,
+    get_sitemap_scope)
+from blog.models import Post, User
+from blog.registry import get_registry
+from blog.utils import get_valid_posts
+from core.constants import (
+    SITEMAP_BATCH_SIZE, SITEMAP_CACHE_TIMEOUT, SITEMAP_SHARD_SIZE)
+
+from django.core.cache import cache
+from django.db.models import Max
+from django.urls import reverse
+from django.utils.html import escape
+
+SECTIONS = ('categories', 'posts', 'authors')
+SITEMAP_XMLNS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+
+def get_shards():
+    """Части карты сайта: пары (раздел, номер части).
+
+    Число частей постов и авторов определяется наибольшим id,
+    поэтому новые объекты не сдвигают границы существующих частей.
+    """
+    shards = [('categories', 0)]
+    for section, model in (('posts', Post), ('authors', User)):
+        max_pk = model.objects.aggregate(max_pk=Max('pk'))['max_pk'] or 0
+        shards += [
+            (section, shard)
+            for shard in range(max_pk // SITEMAP_SHARD_SIZE + 1)
+        ]
+    return shards
+
+
+def get_sitemap_cache_key(section, shard, base_url):
+    """Ключ кэша готовой части. Он меняется, когда меняется версия
+    части (при изменении её постов) или поколение кэша блога,
+    поэтому перестраиваются только изменившиеся части.
+    """
+    return get_page_cache_key(
+        get_sitemap_scope(section, shard),
+        base_url + reverse(
+            'blog:sitemap', kwargs={'section': section, 'shard': shard}
+        )
+    )
+
+
+def stream_sitemap(section, shard, base_url):
+    """Отдаёт часть карты сайта по мере построения
+    и сохраняет её в кэш, когда она построена целиком.
+    """
+    parts = []
+    for part in iter_sitemap(section, shard, base_url):
+        parts.append(part)
+        yield part
+    cache.set(
+        get_sitemap_cache_key(section, shard, base_url), ''.join(parts),
+        get_cache_timeout(SITEMAP_CACHE_TIMEOUT)
+    )
+
+
+def iter_sitemap_index(base_url):
+    """Индекс карты сайта со временем изменения каждой части."""
+    yield (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        f'<sitemapindex xmlns="{SITEMAP_XMLNS}">\n'
+    )
+    for section, shard in get_shards():
+        loc = base_url + reverse(
+            'blog:sitemap', kwargs={'section': section, 'shard': shard}
+        )
+        lastmod = _format_lastmod(datetime.fromtimestamp(
+            get_last_modified(get_sitemap_scope(section, shard)),
+            dt_timezone.utc
+        ))
+        yield (
+            f'<sitemap><loc>{escape(loc)}</loc>'
+            f'<lastmod>{lastmod}</lastmod></sitemap>\n'
+        )
+    yield '</sitemapindex>\n'
+
+
+def iter_sitemap(section, shard, base_url):
+    """Часть карты сайта. Объекты читаются пакетами по id,
+    без загрузки всей выборки в память.
+    """
+    yield (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        f'<urlset xmlns="{SITEMAP_XMLNS}">\n'
+    )
+    for path, lastmod in _ITERATORS[section](shard):
+        url = f'<url><loc>{escape(base_url + path)}</loc>'
+        if lastmod is not None:
+            url += f'<lastmod>{_format_lastmod(lastmod)}</lastmod>'
+        yield url + '</url>\n'
+    yield '</urlset>\n'
+
+
+def _iter_by_pk(queryset, shard, fields):
+    """Значения fields объектов части shard в порядке id."""
+    last_pk = shard * SITEMAP_SHARD_SIZE - 1
+    queryset = queryset.filter(
+        pk__lt=(shard + 1) * SITEMAP_SHARD_SIZE
+    ).order_by('pk').values_list('pk', *fields)
+    while True:
+        batch = list(
+            queryset.filter(pk__gt=last_pk)[:SITEMAP_BATCH_SIZE]
+        )
+        if not batch:
+            return
+        yield from batch
+        last_pk = batch[-1][0]
+
+
+def _iter_categories(shard):
+    for category in get_registry().categories.values():
+        if category.is_published:
+            yield reverse('blog:category_posts', args=(category.slug,)), None
+
+
+def _iter_posts(shard):
+    posts = get_valid_posts(is_guest=True, queryset=Post.objects.all())
+    for pk, updated_at in _iter_by_pk(posts, shard, ('updated_at',)):
+        yield reverse('blog:post_detail', args=(pk,)), updated_at
+
+
+def _iter_authors(shard):
+    authors = User.objects.filter(is_active=True)
+    for pk, username in _iter_by_pk(authors, shard, ('username',)):
+        yield reverse('blog:profile', args=(username,)), None
+
+
+_ITERATORS = {
+    'categories': _iter_categories,
+    'posts': _iter_posts,
+    'authors': _iter_authors,
+}
+
+
+def _format_lastmod(moment):
+    return moment.astimezone(dt_timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
@@ -0,0 +1,38 @@
+from blog.images import get_card_url, get_srcset
+from core.constants import POST_IMAGE_SIZES
+
+from django import template
+from django.utils.html import format_html
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_image_attrs(image):
+    """Атрибуты src, srcset и sizes тега <img> для фото поста.
+
+    Пока уменьшенных копий нет, src указывает на оригинал.
+    """
+    srcset = get_srcset(image)
+    if not srcset:
+        return format_html('src="{}"', image.url)
+    return format_html(
+        'src="{}" srcset="{}" sizes="{}"',
+        get_card_url(image), srcset, POST_IMAGE_SIZES
+    )
+
+
+@register.simple_tag
+def post_image_webp_source(image):
+    """Тег <source> с WebP-версиями фото для элемента <picture>.
+
+    Браузеры, поддерживающие WebP, берут фото отсюда, остальные —
+    из тега <img>. Пока WebP-версий нет, ничего не выводится.
+    """
+    srcset = get_srcset(image, webp=True)
+    if not srcset:
+        return ''
+    return format_html(
+        '<source type="image/webp" srcset="{}" sizes="{}">',
+        srcset, POST_IMAGE_SIZES
+    )
@@ -1,4 +1,4 @@
-from blog import views
+from blog import api, feeds, views
 
 from django.urls import path
 
@@ -6,6 +6,8 @@ app_name = 'blog'
 
 urlpatterns = [
     path('', views.PostListView.as_view(), name='index'),
+    path('rss/', feeds.IndexFeed(), name='index_rss'),
+    path('atom/', feeds.IndexAtomFeed(), name='index_atom'),
     path('posts/create/',
          views.PostCreateView.as_view(), name='create_post'),
     path('posts/<int:post_id>/',
@@ -14,16 +16,44 @@ urlpatterns = [
          views.PostUpdateView.as_view(), name='edit_post'),
     path('posts/<int:post_id>/delete/',
          views.PostDeleteView.as_view(), name='delete_post'),
+    path('posts/<int:post_id>/comments/',
+         views.CommentListView.as_view(), name='comments'),
     path('posts/<int:post_id>/comment/',
          views.CommentCreateView.as_view(), name='add_comment'),
     path('posts/<int:post_id>/comment/<int:comment_id>/',
          views.CommentUpdateView.as_view(), name='edit_comment'),
     path('posts/<int:post_id>/delete_comment/<int:comment_id>/',
          views.CommentDeleteView.as_view(), name='delete_comment'),
+    path('sitemap.xml',
+         views.SitemapIndexView.as_view(), name='sitemap_index'),
+    path('sitemap-<str:section>-<int:shard>.xml',
+         views.SitemapView.as_view(), name='sitemap'),
+    path('api/posts/', api.PostListApiView.as_view(), name='api_posts'),
+    path('api/posts/<int:post_id>/',
+         api.PostDetailApiView.as_view(), name='api_post_detail'),
+    path('api/posts/<int:post_id>/comments/',
+         api.CommentListApiView.as_view(), name='api_comments'),
+    path('api/categories/',
+         api.CategoryListApiView.as_view(), name='api_categories'),
+    path('api/categories/<slug:category_slug>/posts/',
+         api.CategoryPostListApiView.as_view(), name='api_category_posts'),
+    path('api/profiles/<str:author>/posts/',
+         api.ProfilePostListApiView.as_view(), name='api_profile_posts'),
+    path('export/<str:kind>.<str:export_format>',
+         views.ExportView.as_view(), name='export'),
+    path('search/', views.PostSearchView.as_view(), name='search'),
     path('category/<slug:category_slug>/',
          views.CategoryListView.as_view(), name='category_posts'),
+    path('category/<slug:category_slug>/rss/',
+         feeds.CategoryFeed(), name='category_rss'),
+    path('category/<slug:category_slug>/atom/',
+         feeds.CategoryAtomFeed(), name='category_atom'),
     path('profile/edit',
          views.ProfileEditView.as_view(), name='edit_profile'),
     path('profile/<str:author>/',
          views.ProfileListView.as_view(), name='profile'),
+    path('profile/<str:author>/rss/',
+         feeds.AuthorFeed(), name='profile_rss'),
+    path('profile/<str:author>/atom/',
+         feeds.AuthorAtomFeed(), name='profile_atom'),
 ]
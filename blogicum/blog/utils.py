@@ -1,5 +1,15 @@
-from blog.models import Post
+from contextlib import contextmanager
 
+from blog.cache import get_post_scopes, invalidate_scopes
+from blog.models import Comment, Post
+from blog.registry import get_registry
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.recorder import MigrationRecorder
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.http import Http404
+from django.shortcuts import get_object_or_404
 from django.utils import timezone
 
 
@@ -11,11 +21,16 @@ def get_valid_posts(is_guest=False, queryset=None):
     1. Пост снят с публикации;
     2. Дата публикации установлена в будущем;
     3. Категория поста снята с публикации.
+
+    Категории и местоположения берутся из реестра процесса,
+    поэтому их таблицы в запрос не присоединяются. Гостям посты
+    отбираются исключением немногих скрытых категорий, а не перечнем
+    опубликованных: с IN по всем категориям SQLite читает главную через
+    индекс категорий и сортирует результат во временном B-дереве
+    вместо чтения post_published_feed_idx по порядку.
     """
     if queryset is None:
-        posts = Post.objects.select_related(
-            'author', 'category', 'location'
-        )
+        posts = Post.objects.select_related('author').with_registry()
     else:
         posts = queryset
     if is_guest:
@@ -23,6 +38,129 @@ def get_valid_posts(is_guest=False, queryset=None):
         posts = posts.filter(
             is_published=True,
             pub_date__lte=current_date,
-            category__is_published=True,
+            category_id__isnull=False,
+        ).exclude(
+            category_id__in=get_registry().unpublished_category_ids
         )
     return posts
+
+
+def is_post_visible(post):
+    """Проверяет пост на те же условия, что и get_valid_posts(is_guest=True),
+    без обращения к базе: категория поста должна быть уже загружена.
+    """
+    return (
+        post.is_published
+        and post.pub_date <= timezone.now()
+        and post.category is not None
+        and post.category.is_published
+    )
+
+
+def get_post_for_user_or_404(user, post_id):
+    """Загружает пост одним запросом и проверяет, что пользователь user
+    может его видеть: автору доступны и скрытые посты.
+    """
+    post = get_object_or_404(get_valid_posts(), pk=post_id)
+    if user != post.author and not is_post_visible(post):
+        raise Http404('Публикация не найдена.')
+    return post
+
+
+def get_comment_count_subquery():
+    """Выражение с фактическим числом комментариев поста,
+    пригодное для annotate() и update() по модели Post.
+    """
+    comments = Comment.objects.filter(
+        post=OuterRef('pk')
+    ).order_by().values('post').annotate(total=Count('pk')).values('total')
+    return Coalesce(Subquery(comments, output_field=IntegerField()), 0)
+
+
+# Триггеры счётчика комментариев, совпадают с созданными миграцией
+# 0011_comment_count_triggers.
+COMMENT_COUNT_MIGRATION = ('blog', '0011_comment_count_triggers')
+COMMENT_COUNT_TRIGGERS = {
+    'blog_comment_count_insert': '''
+        CREATE TRIGGER IF NOT EXISTS blog_comment_count_insert
+        AFTER INSERT ON blog_comment BEGIN
+            UPDATE blog_post SET comment_count = comment_count + 1
+            WHERE id = new.post_id;
+        END
+    ''',
+    'blog_comment_count_delete': '''
+        CREATE TRIGGER IF NOT EXISTS blog_comment_count_delete
+        AFTER DELETE ON blog_comment BEGIN
+            UPDATE blog_post SET comment_count = max(comment_count - 1, 0)
+            WHERE id = old.post_id;
+        END
+    ''',
+    'blog_comment_count_update': '''
+        CREATE TRIGGER IF NOT EXISTS blog_comment_count_update
+        AFTER UPDATE OF post_id ON blog_comment
+        WHEN old.post_id != new.post_id BEGIN
+            UPDATE blog_post SET comment_count = max(comment_count - 1, 0)
+            WHERE id = old.post_id;
+            UPDATE blog_post SET comment_count = comment_count + 1
+            WHERE id = new.post_id;
+        END
+    ''',
+}
+
+
+def ensure_comment_count_triggers(using=DEFAULT_DB_ALIAS):
+    """Создаёт недостающие триггеры счётчика комментариев.
+
+    SQLite удаляет триггеры, когда Django пересоздаёт таблицу
+    blog_comment. Пока их не было, счётчики могли разойтись
+    с комментариями, поэтому после восстановления они пересчитываются.
+    Возвращает имена созданных триггеров.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite' or COMMENT_COUNT_MIGRATION not in (
+        MigrationRecorder(connection).applied_migrations()
+    ):
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger'"
+        )
+        existing = {name for name, in cursor.fetchall()}
+        missing = [
+            name for name in COMMENT_COUNT_TRIGGERS if name not in existing
+        ]
+        for name in missing:
+            cursor.execute(COMMENT_COUNT_TRIGGERS[name])
+    if missing:
+        Post.objects.using(using).update(
+            comment_count=get_comment_count_subquery()
+        )
+    return missing
+
+
+def touch_posts(post_ids):
+    """Отмечает посты изменёнными и сбрасывает кэш их областей
+    видимости: в них выводится число комментариев постов.
+    """
+    posts = Post.objects.filter(pk__in=post_ids)
+    posts.update(updated_at=timezone.now())
+    invalidate_scopes(get_post_scopes(posts))
+
+
+@contextmanager
+def keep_created_at(model, fields=('created_at',)):
+    """Отключает auto_now_add и auto_now у полей дат модели, чтобы
+    bulk_create сохранил заданные значения, а не текущее время.
+
+    Флаги полей общие для процесса, поэтому подходит только для команд.
+    """
+    flags = {}
+    for name in fields:
+        field = model._meta.get_field(name)
+        flags[field] = (field.auto_now, field.auto_now_add)
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in flags.items():
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
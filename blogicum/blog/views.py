@@ -1,15 +1,31 @@
+from blog.cache import (
+    get_author_scope, get_category_scope, get_generation, get_index_scope,
+    get_last_modified, get_profile_author)
+from blog.export import EXPORTS, FORMATS, iter_export
 from blog.forms import CommentForm, PostForm
 from blog.mixins import (
-    CommentMixin, PostChangeMixin,
+    CommentMixin, ConditionalGetMixin, PostChangeMixin, PostListMixin,
     CommentChangeMixin, ProfileRedirectMixin)
-from blog.models import Category, Post, User
-from blog.utils import get_valid_posts
-from core.constants import POSTS_ON_PAGE
-
-from django.contrib.auth.mixins import LoginRequiredMixin
+from blog.models import Post, User
+from blog.pagination import paginate_comments, paginate_forward
+from blog.registry import get_registry
+from blog.search import search_posts
+from blog.sitemaps import (
+    SECTIONS, get_sitemap_cache_key, iter_sitemap_index, stream_sitemap)
+from blog.utils import (
+    get_post_for_user_or_404, get_valid_posts, touch_posts)
+from core.constants import (
+    COMMENTS_ON_PAGE, POST_CARD_CACHE_TIMEOUT, POSTS_ON_PAGE)
+
+from django.contrib.auth.mixins import (LoginRequiredMixin,
+                                        UserPassesTestMixin)
+from django.db import transaction
+from django.core.cache import cache
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.http import urlencode
 from django.views.generic import (CreateView, DeleteView, DetailView, ListView,
-                                  UpdateView)
+                                  UpdateView, View)
 
 
 class PostCreateView(ProfileRedirectMixin, CreateView):
@@ -22,57 +38,101 @@ class PostCreateView(ProfileRedirectMixin, CreateView):
         return super().form_valid(form)
 
 
-class PostDetailView(DetailView):
+class PostDetailView(ConditionalGetMixin, DetailView):
     template_name = 'blog/detail.html'
 
+    def get_validators(self):
+        self.object = self.get_object()
+        last_modified = max(
+            self.object.updated_at.timestamp(), get_last_modified()
+        )
+        return (
+            self.get_etag(
+                self.object.pk, last_modified, self.request.get_full_path()
+            ),
+            int(last_modified)
+        )
+
     def get_object(self):
-        queryset = get_valid_posts()
-        obj = get_object_or_404(queryset, pk=self.kwargs['post_id'])
-        if self.request.user != obj.author:
-            return get_object_or_404(
-                get_valid_posts(is_guest=True,
-                                queryset=queryset),
-                pk=self.kwargs['post_id']
-            )
-        return obj
+        # Пост уже загружен при вычислении валидаторов в get_validators().
+        if getattr(self, 'object', None) is not None:
+            return self.object
+        return get_post_for_user_or_404(
+            self.request.user, self.kwargs['post_id']
+        )
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['comments'] = (
-            self.object.comments.select_related('author')
+        context['comments'] = paginate_comments(
+            self.object.comments.select_related('author'),
+            self.request.GET.get('comments', ''),
+            COMMENTS_ON_PAGE
         )
         context['form'] = CommentForm()
         return context
 
 
-class PostListView(ListView):
+class PostListView(PostListMixin, ListView):
     template_name = 'blog/index.html'
-    paginate_by = POSTS_ON_PAGE
 
     def get_queryset(self):
         return get_valid_posts(is_guest=True)
 
+    def get_cache_scope(self):
+        return get_index_scope()
+
 
-class CategoryListView(ListView):
+class CategoryListView(PostListMixin, ListView):
     template_name = 'blog/category.html'
-    paginate_by = POSTS_ON_PAGE
+
+    def get_category(self):
+        category = get_registry().get_published_category(
+            self.kwargs['category_slug']
+        )
+        if category is None:
+            raise Http404('Категория не найдена.')
+        return category
 
     def get_queryset(self):
-        post_list = (
-            get_valid_posts(is_guest=True).filter(
-                category__slug=self.kwargs['category_slug'],
-                category__is_published=True
-            )
+        return get_valid_posts(is_guest=True).filter(
+            category_id=self.get_category().pk
         )
-        return post_list
+
+    def get_cache_scope(self):
+        return get_category_scope(self.kwargs['category_slug'])
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['category'] = get_object_or_404(
-            Category,
-            slug=self.kwargs['category_slug'],
-            is_published=True
+        context['category'] = self.get_category()
+        return context
+
+
+class PostSearchView(ListView):
+    """Полнотекстовый поиск по опубликованным постам.
+
+    Результаты упорядочены по релевантности и листаются курсором.
+    """
+
+    template_name = 'blog/search.html'
+    paginate_by = POSTS_ON_PAGE
+
+    def get_queryset(self):
+        self.query = self.request.GET.get('q', '').strip()
+        return search_posts(get_valid_posts(is_guest=True), self.query)
+
+    def paginate_queryset(self, queryset, page_size):
+        page = paginate_forward(
+            queryset, self.request.GET.get('cursor', ''), page_size,
+            'search_rank', float
         )
+        return None, page, page.object_list, page.has_other_pages()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.query
+        context['cursor_query'] = urlencode({'q': self.query}) + '&'
+        context['card_cache_timeout'] = POST_CARD_CACHE_TIMEOUT
+        context['card_generation'] = get_generation()
         return context
 
 
@@ -94,42 +154,80 @@ class CommentCreateView(CommentMixin, LoginRequiredMixin, CreateView):
     def form_valid(self, form):
         form.instance.author = self.request.user
         form.instance.post_id = self.kwargs['post_id']
-        return super().form_valid(form)
+        with transaction.atomic():
+            return super().form_valid(form)
 
     def dispatch(self, request, *args, **kwargs):
-        get_object_or_404(Post, pk=kwargs['post_id'])
+        if not Post.objects.filter(pk=kwargs['post_id']).exists():
+            raise Http404('Публикация не найдена.')
         return super().dispatch(request, *args, **kwargs)
 
 
+class CommentListView(CommentMixin, ListView):
+    """Фрагмент со следующей страницей комментариев к посту
+    для подгрузки на странице публикации.
+    """
+
+    template_name = 'includes/comment_list.html'
+    context_object_name = 'comments'
+
+    def get_queryset(self):
+        self.commented_post = get_post_for_user_or_404(
+            self.request.user, self.kwargs['post_id']
+        )
+        return paginate_comments(
+            self.commented_post.comments.select_related('author'),
+            self.request.GET.get('cursor', ''),
+            COMMENTS_ON_PAGE
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['post'] = self.commented_post
+        return context
+
+
 class CommentUpdateView(CommentChangeMixin, UpdateView):
     form_class = CommentForm
 
 
 class CommentDeleteView(CommentChangeMixin, DeleteView):
 
+    def delete(self, request, *args, **kwargs):
+        with transaction.atomic():
+            response = super().delete(request, *args, **kwargs)
+            # У Comment нет обработчика post_delete (см. signals).
+            touch_posts([self.object.post_id])
+        return response
+
     def get_success_url(self):
         return self.object.get_absolute_url()
 
 
-class ProfileListView(ListView):
+class ProfileListView(PostListMixin, ListView):
     template_name = 'blog/profile.html'
-    paginate_by = POSTS_ON_PAGE
+
+    def get_author(self):
+        # Автор загружается один раз за запрос и до любых запросов постов.
+        if not hasattr(self, 'author'):
+            self.author = get_profile_author(self.kwargs['author'])
+        return self.author
 
     def get_queryset(self):
-        if self.request.user.username != self.kwargs['author']:
-            return get_valid_posts(is_guest=True).filter(
-                author__username=self.kwargs['author']
-            )
-        else:
-            return get_valid_posts().filter(
-                author__username=self.kwargs['author']
-            )
+        author = self.get_author()
+        return get_valid_posts(
+            is_guest=self.request.user.pk != author.pk
+        ).filter(author_id=author.pk)
+
+    def get_cache_scope(self):
+        return get_author_scope(
+            self.kwargs['author'],
+            is_owner=self.request.user.username == self.kwargs['author']
+        )
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['profile'] = get_object_or_404(
-            User, username=self.kwargs['author']
-        )
+        context['profile'] = self.get_author()
         return context
 
 
@@ -143,3 +241,48 @@ class ProfileEditView(ProfileRedirectMixin, UpdateView):
             User,
             username=self.request.user.username
         )
+
+
+class SitemapIndexView(View):
+    """Индекс карты сайта со ссылками на все её части."""
+
+    def get(self, request):
+        return HttpResponse(
+            ''.join(iter_sitemap_index(request.build_absolute_uri('/')[:-1])),
+            content_type='application/xml'
+        )
+
+
+class SitemapView(View):
+    """Часть карты сайта: берётся из кэша или строится потоком."""
+
+    def get(self, request, section, shard):
+        if section not in SECTIONS or (section == 'categories' and shard):
+            raise Http404('Часть карты сайта не найдена.')
+        base_url = request.build_absolute_uri('/')[:-1]
+        content = cache.get(get_sitemap_cache_key(section, shard, base_url))
+        if content is not None:
+            return HttpResponse(content, content_type='application/xml')
+        return StreamingHttpResponse(
+            stream_sitemap(section, shard, base_url),
+            content_type='application/xml'
+        )
+
+
+class ExportView(UserPassesTestMixin, View):
+    """Потоковая выгрузка постов или комментариев для персонала."""
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request, kind, export_format):
+        if kind not in EXPORTS or export_format not in FORMATS:
+            raise Http404('Выгрузка не найдена.')
+        response = StreamingHttpResponse(
+            iter_export(kind, export_format),
+            content_type=FORMATS[export_format]
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{kind}.{export_format}"'
+        )
+        return response
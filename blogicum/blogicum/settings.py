@@ -62,6 +62,18 @@ DATABASES = {
     }
 }
 
+# Кэш в памяти процесса подходит только для одного процесса сервера;
+# при нескольких нужен общий бэкенд (см. check --deploy, blog.W001).
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Включайте только вместе с командой run_publication_scheduler
+# и общим для всех процессов бэкендом кэша.
+PUBLICATION_SCHEDULER_ENABLED = False
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
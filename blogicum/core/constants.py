@@ -1,4 +1,32 @@
 TITLE_LIMIT = 30
 FIELD_TEXT_LIMIT = 256
 POSTS_ON_PAGE = 10
+COMMENTS_ON_PAGE = 20
 SLUG_LIMIT = 64
+PAGINATOR_WINDOW = 2
+POST_COUNT_CACHE_TIMEOUT = 300
+POST_CARD_CACHE_TIMEOUT = 60 * 60
+POST_PAGE_CACHE_TIMEOUT = 60 * 10
+PROFILE_CACHE_TIMEOUT = 60 * 60
+# Реестр категорий и местоположений перечитывается не реже чем раз
+# в столько секунд, даже если сброс версии до процесса не дошёл.
+REGISTRY_MAX_AGE = 60
+# Ширины (px) уменьшенных копий фото постов: для узких экранов,
+# для карточки шириной 40rem и для неё же на экранах с плотностью 2x.
+POST_IMAGE_WIDTHS = (320, 640, 1280)
+POST_IMAGE_CARD_WIDTH = 640
+POST_IMAGE_SIZES = '(max-width: 40rem) 100vw, 40rem'
+POST_IMAGE_QUALITY = 85
+IMAGE_JOB_MAX_ATTEMPTS = 5
+# Задержка (с) перед повтором упавшего задания; удваивается с каждой попыткой.
+IMAGE_JOB_RETRY_DELAY = 30
+# Задание, которое обрабатывается дольше (с), считается брошенным.
+IMAGE_JOB_TIMEOUT = 60 * 10
+FEED_ITEMS = 20
+FEED_CACHE_TIMEOUT = 60 * 10
+# Число id постов (и пользователей) в одной части карты сайта:
+# часть покрывает id от shard * SIZE до (shard + 1) * SIZE - 1.
+SITEMAP_SHARD_SIZE = 10_000
+SITEMAP_BATCH_SIZE = 1000
+SITEMAP_CACHE_TIMEOUT = 60 * 60
+API_PAGE_SIZE = 20
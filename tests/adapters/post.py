@@ -32,6 +32,9 @@ class PostModelAdapter(StudentModelAdapter):
             "author",
             "category",
             "location",
+            "image_width",
+            "image_height",
+            "comment_count",
             "refresh_from_db",
         ]
 
@@ -0,0 +1,119 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def api_posts(mixer, user, published_category, published_location):
+    now = timezone.now()
+    return [
+        mixer.blend(
+            'blog.Post', author=user, category=published_category,
+            location=published_location, is_published=True,
+            pub_date=now - timedelta(minutes=i), image=''
+        )
+        for i in range(25)
+    ]
+
+
+@pytest.fixture
+def hidden_post(mixer, user, published_category):
+    return mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=False, title='Скрытый пост'
+    )
+
+
+def _ids(response):
+    assert response.status_code == 200, response.content
+    return [row['id'] for row in response.json()['results']]
+
+
+@pytest.mark.parametrize('url', [
+    '/api/posts/',
+    '/api/categories/{slug}/posts/',
+    '/api/profiles/{username}/posts/',
+])
+def test_api_post_lists_paginate_by_cursor(
+        client, user, published_category, api_posts, hidden_post, url
+):
+    url = url.format(slug=published_category.slug, username=user.username)
+    response = client.get(url)
+    data = response.json()
+    ids = _ids(response)
+    assert len(ids) == 20 and data['next'], (
+        f"Убедитесь, что `{url}` отдаёт первую страницу и ссылку на"
+        " следующую."
+    )
+    ids += _ids(client.get(data['next']))
+    assert ids == [post.id for post in api_posts], (
+        f"Убедитесь, что `{url}` листает видимые посты от новых к старым."
+    )
+
+
+def test_api_applies_visibility_rules(
+        client, user_client, user, hidden_post, published_location
+):
+    assert hidden_post.id not in _ids(
+        client.get(f'/api/profiles/{user.username}/posts/')
+    )
+    assert hidden_post.id in _ids(
+        user_client.get(f'/api/profiles/{user.username}/posts/')
+    ), "Убедитесь, что автор видит в API свои скрытые посты."
+    assert client.get(f'/api/posts/{hidden_post.id}/').status_code == 404
+    assert user_client.get(
+        f'/api/posts/{hidden_post.id}/'
+    ).status_code == 200
+    assert client.get(
+        f'/api/posts/{hidden_post.id}/comments/'
+    ).status_code == 404
+
+
+def test_api_sparse_fieldsets_use_values(
+        client, api_posts, published_category, published_location
+):
+    post = api_posts[0]
+    response = client.get(f'/api/posts/{post.id}/')
+    assert response.json()['category'] == published_category.slug
+    assert response.json()['location'] == published_location.name
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get('/api/posts/', {'fields': 'id,title'})
+    assert set(response.json()['results'][0]) == {'id', 'title'}
+    page_sql = ctx.captured_queries[-1]['sql']
+    assert '"blog_post"."text"' not in page_sql, (
+        "Убедитесь, что API выбирает только запрошенные столбцы."
+    )
+    assert 'auth_user' not in page_sql
+    response = client.get('/api/posts/', {'fields': 'id,password'})
+    assert response.status_code == 400
+
+
+def test_api_etags(client, mixer, user, api_posts):
+    post = api_posts[0]
+    for url in ('/api/posts/', f'/api/posts/{post.id}/'):
+        etag = client.get(url)['ETag']
+        assert client.get(
+            url, HTTP_IF_NONE_MATCH=etag
+        ).status_code == 304, (
+            f"Убедитесь, что `{url}` отвечает 304 на актуальный ETag."
+        )
+    mixer.blend('blog.Comment', post=post, author=user, text='Новый')
+    response = client.get(
+        f'/api/posts/{post.id}/comments/', HTTP_IF_NONE_MATCH=etag
+    )
+    assert response.status_code == 200
+    assert response.json()['results'][0]['text'] == 'Новый'
+
+
+def test_api_categories(client, published_category, mixer):
+    hidden = mixer.blend('blog.Category', is_published=False)
+    slugs = [
+        row['slug'] for row in client.get('/api/categories/').json()['results']
+    ]
+    assert published_category.slug in slugs and hidden.slug not in slugs
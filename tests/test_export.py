@@ -0,0 +1,80 @@
+import csv
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def export_posts(mixer, user, published_category, published_location):
+    posts = mixer.cycle(7).blend(
+        'blog.Post', author=user, category=published_category,
+        location=published_location, image=''
+    )
+    mixer.cycle(3).blend('blog.Comment', post=posts[0], author=user)
+    return posts
+
+
+def test_export_jsonl_batches(export_posts):
+    out = io.StringIO()
+    with CaptureQueriesContext(connection) as queries:
+        call_command('export_blog', 'posts', '--batch-size=3', stdout=out)
+    rows = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [row['id'] for row in rows] == sorted(
+        post.pk for post in export_posts
+    ), "Убедитесь, что выгрузка содержит все посты в порядке id."
+    assert rows[0]['author'] == export_posts[0].author.username, (
+        "Убедитесь, что в выгрузке поста есть имя автора."
+    )
+    assert rows[0]['category'] == export_posts[0].category.slug, (
+        "Убедитесь, что в выгрузке поста есть слаг категории."
+    )
+    assert rows[0]['location'] == export_posts[0].location.name, (
+        "Убедитесь, что в выгрузке поста есть название местоположения."
+    )
+    assert len(queries) == 3, (
+        "Убедитесь, что посты выгружаются пакетами по id без отдельных"
+        " запросов для связанных объектов."
+    )
+    assert all(
+        'OFFSET' not in query['sql'] for query in queries.captured_queries
+    ), "Убедитесь, что пакеты выгрузки выбираются без OFFSET."
+
+
+def test_export_comments_csv(export_posts):
+    out = io.StringIO()
+    call_command('export_blog', 'comments', '--format=csv', stdout=out)
+    rows = list(csv.reader(io.StringIO(out.getvalue())))
+    assert rows[0] == ['id', 'post_id', 'author', 'text', 'created_at'], (
+        "Убедитесь, что первая строка CSV содержит заголовки столбцов."
+    )
+    assert len(rows) == 4, (
+        "Убедитесь, что в CSV попадают все комментарии."
+    )
+
+
+def test_export_view_is_staff_only(
+        export_posts, user_client, admin_client, unlogged_client):
+    url = '/export/posts.jsonl'
+    assert unlogged_client.get(url).status_code == 302, (
+        "Убедитесь, что анонимный пользователь перенаправляется"
+        " на страницу входа."
+    )
+    assert user_client.get(url).status_code == 403, (
+        "Убедитесь, что выгрузка недоступна пользователям без статуса"
+        " персонала."
+    )
+    response = admin_client.get(url)
+    assert response.streaming, "Убедитесь, что выгрузка отдаётся потоком."
+    lines = b''.join(response.streaming_content).decode().splitlines()
+    assert len(lines) == len(export_posts), (
+        "Убедитесь, что ответ содержит по строке на каждый пост."
+    )
+    assert admin_client.get('/export/users.jsonl').status_code == 404, (
+        "Убедитесь, что для неизвестной выгрузки возвращается ошибка 404."
+    )
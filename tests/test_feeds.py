@@ -0,0 +1,110 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def visible_post(mixer, user, published_category):
+    return mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        title='Видимый пост', is_published=True,
+        pub_date=timezone.now() - timedelta(hours=1)
+    )
+
+
+@pytest.fixture
+def hidden_post(mixer, user, published_category):
+    return mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        title='Скрытый пост', is_published=False
+    )
+
+
+@pytest.mark.parametrize('url, content_type', [
+    ('/rss/', 'application/rss+xml'),
+    ('/atom/', 'application/atom+xml'),
+    ('/category/{slug}/rss/', 'application/rss+xml'),
+    ('/category/{slug}/atom/', 'application/atom+xml'),
+    ('/profile/{username}/rss/', 'application/rss+xml'),
+    ('/profile/{username}/atom/', 'application/atom+xml'),
+])
+def test_feeds_show_visible_posts(
+        client, user, published_category, visible_post, hidden_post, url,
+        content_type
+):
+    url = url.format(slug=published_category.slug, username=user.username)
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response['Content-Type'].startswith(content_type)
+    content = response.content.decode()
+    assert 'Видимый пост' in content and 'Скрытый пост' not in content, (
+        f"Убедитесь, что лента `{url}` выводит только видимые гостям посты."
+    )
+
+
+def test_missing_feed_objects_return_404(client, mixer):
+    hidden_category = mixer.blend('blog.Category', is_published=False)
+    assert client.get(
+        f'/category/{hidden_category.slug}/rss/'
+    ).status_code == 404
+    assert client.get('/profile/no_such_user/rss/').status_code == 404
+
+
+def test_feed_is_cached_and_supports_conditional_get(
+        client, mixer, user, published_category, visible_post
+):
+    response = client.get('/rss/')
+    etag = response['ETag']
+    with CaptureQueriesContext(connection) as ctx:
+        cached = client.get('/rss/')
+    assert cached.content == response.content
+    assert cached['ETag'] == etag
+    assert cached['Last-Modified'] == response['Last-Modified']
+    assert not ctx.captured_queries, (
+        "Убедитесь, что готовая лента и её валидаторы берутся из кэша"
+        " без запросов к базе."
+    )
+    with CaptureQueriesContext(connection) as ctx:
+        not_modified = client.get('/rss/', HTTP_IF_NONE_MATCH=etag)
+    assert not_modified.status_code == 304 and not ctx.captured_queries, (
+        "Убедитесь, что ответ 304 на закэшированную ленту не требует"
+        " запросов к базе."
+    )
+    assert client.get(
+        '/rss/', HTTP_IF_NONE_MATCH=etag
+    ).status_code == 304, (
+        "Убедитесь, что лента отвечает 304 Not Modified на запрос"
+        " с актуальным ETag."
+    )
+    assert client.get(
+        '/rss/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+    ).status_code == 304
+
+    mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        title='Новый пост', is_published=True,
+        pub_date=timezone.now() - timedelta(minutes=1)
+    )
+    response = client.get('/rss/', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200 and 'Новый пост' in (
+        response.content.decode()
+    ), "Убедитесь, что лента обновляется после изменения постов."
+
+
+def test_feed_cache_is_per_scheme_and_host(client, settings, visible_post):
+    settings.ALLOWED_HOSTS = ['testserver', 'mirror.example']
+    assert 'http://testserver/posts/' in client.get('/rss/').content.decode()
+    for kwargs, expected in (
+        ({'HTTP_HOST': 'mirror.example'}, 'http://mirror.example/posts/'),
+        ({'secure': True}, 'https://testserver/posts/'),
+    ):
+        content = client.get('/rss/', **kwargs).content.decode()
+        assert expected in content, (
+            "Убедитесь, что лента, закэшированная для одного хоста или"
+            " схемы, не отдаётся по другому хосту или схеме."
+        )
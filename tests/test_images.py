@@ -0,0 +1,237 @@
+from datetime import timedelta
+from io import BytesIO
+
+import pytest
+from blog.images import get_variant_name, get_webp_name
+from blog.jobs import claim_image_jobs, get_image_job_metrics
+from blog.models import ImageJob, Post
+from core.constants import IMAGE_JOB_MAX_ATTEMPTS, IMAGE_JOB_TIMEOUT
+from django.core.files.images import ImageFile
+from django.core.management import call_command
+from django.utils import timezone
+from PIL import Image
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+def _image_file(
+        width, height, image_format='JPEG', name='photo.jpg', **options
+):
+    image_io = BytesIO()
+    Image.new('RGB', (width, height), color=(73, 109, 137)).save(
+        image_io, format=image_format, **options
+    )
+    return ImageFile(image_io, name=name)
+
+
+def _process_jobs():
+    call_command('process_image_jobs', once=True, workers=1)
+
+
+def test_variants_generated_on_upload(
+        mixer, user, published_category, media_root
+):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        image=_image_file(1500, 1000)
+    )
+    assert not (media_root / get_variant_name(post.image.name, 320)).exists(), (
+        "Убедитесь, что фото обрабатывается в очереди, а не в запросе."
+    )
+    _process_jobs()
+    for width in (320, 640, 1280):
+        variant = media_root / get_variant_name(post.image.name, width)
+        assert variant.exists(), (
+            f"Убедитесь, что при загрузке фото создаётся его копия"
+            f" шириной {width}px рядом с оригиналом."
+        )
+        with Image.open(variant) as image:
+            assert image.size == (width, round(1000 * width / 1500))
+
+
+def test_variants_not_wider_than_original(
+        mixer, user, published_category, media_root
+):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        image=_image_file(500, 500, 'PNG', 'photo.png')
+    )
+    _process_jobs()
+    assert (media_root / get_variant_name(post.image.name, 320)).exists()
+    assert not (media_root / get_variant_name(post.image.name, 640)).exists()
+
+
+def test_templates_emit_srcset(
+        user_client, mixer, user, published_category
+):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        image=_image_file(1500, 1000)
+    )
+    content = user_client.get('/').content.decode()
+    assert 'srcset=' not in content and f'src="{post.image.url}"' in content, (
+        "Убедитесь, что пока копии фото не готовы, выводится оригинал."
+    )
+    _process_jobs()
+    for url in ('/', f'/posts/{post.id}/'):
+        content = user_client.get(url).content.decode()
+        assert 'srcset=' in content and 'sizes=' in content, (
+            f"Убедитесь, что страница `{url}` выводит фото поста"
+            " с атрибутами srcset и sizes."
+        )
+        assert get_variant_name(post.image.url, 640) in content
+        assert '<source type="image/webp"' in content, (
+            f"Убедитесь, что страница `{url}` предлагает браузерам"
+            " WebP-версию фото."
+        )
+
+    post.image = _image_file(100, 100)
+    post.save()
+    content = user_client.get(f'/posts/{post.id}/').content.decode()
+    assert 'srcset=' not in content
+    assert f'src="{post.image.url}"' in content
+
+
+def test_failed_jobs_are_retried_with_metrics(
+        mixer, user, published_category, media_root
+):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        image=_image_file(1500, 1000)
+    )
+    (media_root / post.image.name).unlink()
+    _process_jobs()
+    job = ImageJob.objects.get(post=post)
+    assert job.status == ImageJob.Status.PENDING and job.attempts == 1, (
+        "Убедитесь, что упавшее задание возвращается в очередь."
+    )
+    assert job.error
+    assert claim_image_jobs(10) == [], (
+        "Убедитесь, что повтор задания откладывается."
+    )
+    metrics = get_image_job_metrics()
+    assert metrics['backlog'] == 1 and metrics['retrying'] == 1
+    assert metrics['ready'] == 0
+
+    ImageJob.objects.update(attempts=4, available_at=job.created_at)
+    _process_jobs()
+    job.refresh_from_db()
+    assert job.status == ImageJob.Status.FAILED, (
+        "Убедитесь, что после исчерпания попыток задание помечается"
+        " неудачным."
+    )
+    assert get_image_job_metrics()['failed'] == 1
+
+
+def test_abandoned_jobs_respect_max_attempts(mixer, user):
+    post = mixer.blend('blog.Post', author=user, image='')
+    started_at = timezone.now() - timedelta(seconds=IMAGE_JOB_TIMEOUT + 1)
+    retried, exhausted = (
+        ImageJob.objects.create(
+            post=post, image='posts_images/photo.jpg',
+            status=ImageJob.Status.RUNNING, attempts=attempts,
+            started_at=started_at
+        )
+        for attempts in (1, IMAGE_JOB_MAX_ATTEMPTS)
+    )
+    assert claim_image_jobs(10) == [retried], (
+        "Убедитесь, что брошенное задание с оставшимися попытками"
+        " снова берётся в работу."
+    )
+    exhausted.refresh_from_db()
+    assert exhausted.status == ImageJob.Status.FAILED, (
+        "Убедитесь, что брошенное задание, исчерпавшее попытки,"
+        " помечается неудачным, а не возвращается в очередь."
+    )
+    assert exhausted.finished_at and exhausted.error
+
+
+def test_webp_versions_cached_on_disk(
+        mixer, user, published_category, media_root
+):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        image=_image_file(1500, 1000)
+    )
+    _process_jobs()
+    webp = media_root / get_webp_name(get_variant_name(post.image.name, 640))
+    with Image.open(webp) as image:
+        assert image.format == 'WEBP' and image.width == 640
+    converted_at = webp.stat().st_mtime_ns
+    ImageJob.objects.update(status=ImageJob.Status.PENDING, attempts=0)
+    _process_jobs()
+    assert webp.stat().st_mtime_ns == converted_at, (
+        "Убедитесь, что WebP-версия фото создаётся не больше одного раза."
+    )
+
+    png_post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        image=_image_file(1500, 1000, 'PNG', 'photo.png')
+    )
+    _process_jobs()
+    png = media_root / get_variant_name(png_post.image.name, 640)
+    png_webp = media_root / get_webp_name(png.relative_to(media_root))
+    assert not png_webp.exists() or (
+        png_webp.stat().st_size < png.stat().st_size
+    ), "Убедитесь, что WebP-версия PNG сохраняется, только если она меньше."
+
+
+def test_image_dimensions_stored_and_rendered(
+        user_client, mixer, user, published_category
+):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        image=_image_file(1500, 1000)
+    )
+    post.refresh_from_db()
+    assert (post.image_width, post.image_height) == (1500, 1000), (
+        "Убедитесь, что при загрузке фото сохраняются его размеры."
+    )
+    for url in ('/', f'/posts/{post.id}/'):
+        content = user_client.get(url).content.decode()
+        assert 'width="1500" height="1000" loading="lazy"' in content, (
+            f"Убедитесь, что страница `{url}` выводит размеры фото"
+            " и отложенную загрузку."
+        )
+
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    post.image = _image_file(300, 200, exif=exif)
+    post.save()
+    assert (post.image_width, post.image_height) == (200, 300), (
+        "Убедитесь, что размеры учитывают поворот фото из EXIF."
+    )
+
+    post.image = None
+    post.save()
+    assert post.image_width is None and post.image_height is None
+
+
+def test_backfill_image_dimensions(
+        mixer, user, published_category, media_root
+):
+    posts = [
+        mixer.blend(
+            'blog.Post', author=user, category=published_category,
+            image=_image_file(400 + i, 300)
+        )
+        for i in range(3)
+    ]
+    (media_root / posts[0].image.name).unlink()
+    Post.objects.update(image_width=None, image_height=None)
+    call_command('backfill_image_dimensions', batch_size=2)
+    dimensions = list(
+        Post.objects.order_by('pk').values_list(
+            'image_width', 'image_height'
+        )
+    )
+    assert dimensions == [(None, None), (401, 300), (402, 300)], (
+        "Убедитесь, что команда backfill_image_dimensions заполняет"
+        " размеры фото всех постов, у которых файл доступен."
+    )
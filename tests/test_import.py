@@ -0,0 +1,150 @@
+import io
+import json
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.models import Category, Comment, Location, Post, User
+
+pytestmark = [pytest.mark.django_db]
+
+
+def write_jsonl(path, rows):
+    path.write_text(
+        ''.join(json.dumps(row) + '\n' for row in rows), encoding='utf-8'
+    )
+    return path
+
+
+def make_post_rows(count, start_id=1000):
+    pub_date = timezone.now().isoformat()
+    return [
+        {
+            'id': start_id + i, 'title': f'Пост {i}', 'text': 'Текст',
+            'pub_date': pub_date, 'is_published': True,
+            'author': f'author{i % 2}', 'category': 'imported',
+            'category_title': 'Импорт', 'location': 'Москва', 'image': '',
+        }
+        for i in range(count)
+    ]
+
+
+def run_import(*args):
+    out = io.StringIO()
+    call_command('import_blog', *args, stdout=out)
+    return out.getvalue()
+
+
+def test_import_creates_missing_lookups(tmp_path, user):
+    rows = make_post_rows(5)
+    rows[0]['author'] = user.username
+    output = run_import('posts', str(write_jsonl(tmp_path / 'p.jsonl', rows)),
+                        '--batch-size=2')
+    assert Post.objects.count() == 5, (
+        "Убедитесь, что импортируются все посты."
+    )
+    assert Post.objects.get(pk=1000).author == user, (
+        "Убедитесь, что существующий автор находится по имени пользователя."
+    )
+    assert User.objects.filter(username__startswith='author').count() == 2, (
+        "Убедитесь, что недостающие авторы создаются по одному разу."
+    )
+    assert Category.objects.get(slug='imported').title == 'Импорт', (
+        "Убедитесь, что недостающая категория создаётся с заголовком"
+        " из выгрузки."
+    )
+    assert Location.objects.filter(name='Москва').count() == 1, (
+        "Убедитесь, что недостающее местоположение создаётся один раз."
+    )
+    assert 'строк/с' in output, (
+        "Убедитесь, что команда сообщает скорость импорта."
+    )
+    assert not (tmp_path / 'p.jsonl.checkpoint').exists(), (
+        "Убедитесь, что после успешного импорта контрольная точка"
+        " удаляется."
+    )
+
+
+def test_import_resumes_from_checkpoint(tmp_path):
+    path = write_jsonl(tmp_path / 'p.jsonl', make_post_rows(5))
+    (tmp_path / 'p.jsonl.checkpoint').write_text('3')
+    run_import('posts', str(path))
+    assert sorted(Post.objects.values_list('pk', flat=True)) == [1003, 1004], (
+        "Убедитесь, что импорт продолжается со строки после контрольной"
+        " точки."
+    )
+    run_import('posts', str(path), '--restart')
+    assert Post.objects.count() == 5, (
+        "Убедитесь, что повторный импорт не дублирует посты с теми же id."
+    )
+
+
+def test_import_comments_updates_counts(tmp_path):
+    run_import('posts', str(write_jsonl(
+        tmp_path / 'p.jsonl', make_post_rows(2)
+    )))
+    comments = [
+        {'id': 1, 'post_id': 1000, 'author': 'reader', 'text': 'Первый'},
+        {'id': 2, 'post_id': 1000, 'author': 'reader', 'text': 'Второй'},
+        {'id': 3, 'post_id': 1, 'author': 'reader', 'text': 'Без поста'},
+    ]
+    output = run_import(
+        'comments', str(write_jsonl(tmp_path / 'c.jsonl', comments))
+    )
+    assert Comment.objects.count() == 2, (
+        "Убедитесь, что комментарии к несуществующим постам пропускаются."
+    )
+    assert Post.objects.get(pk=1000).comment_count == 2, (
+        "Убедитесь, что импорт комментариев обновляет счётчик комментариев"
+        " поста."
+    )
+    assert 'пропущено: 1' in output, (
+        "Убедитесь, что команда сообщает число пропущенных строк."
+    )
+
+
+def test_export_import_round_trip(tmp_path, mixer, user, published_category):
+    posts = mixer.cycle(3).blend(
+        'blog.Post', author=user, category=published_category, image=''
+    )
+    out = io.StringIO()
+    call_command('export_blog', 'posts', stdout=out)
+    path = tmp_path / 'export.jsonl'
+    path.write_text(out.getvalue(), encoding='utf-8')
+    expected = {post.pk: post.title for post in posts}
+    Post.objects.all().delete()
+    run_import('posts', str(path))
+    assert dict(Post.objects.values_list('pk', 'title')) == expected, (
+        "Убедитесь, что выгрузка export_blog импортируется без изменений."
+    )
+
+
+def test_import_keeps_source_created_at(tmp_path):
+    created_at = timezone.now() - timedelta(days=400)
+    rows = make_post_rows(1)
+    rows[0]['created_at'] = created_at.isoformat()
+    run_import('posts', str(write_jsonl(tmp_path / 'p.jsonl', rows)))
+    comments = [
+        {
+            'id': i, 'post_id': 1000, 'author': 'reader', 'text': 'Текст',
+            'created_at': (created_at + timedelta(hours=i)).isoformat(),
+        }
+        for i in (1, 2)
+    ]
+    run_import('comments', str(write_jsonl(tmp_path / 'c.jsonl', comments)))
+    assert Post.objects.get(pk=1000).created_at == created_at, (
+        "Убедитесь, что импортированный пост сохраняет время создания"
+        " из выгрузки."
+    )
+    assert list(
+        Comment.objects.order_by('pk').values_list('created_at', flat=True)
+    ) == [created_at + timedelta(hours=i) for i in (1, 2)], (
+        "Убедитесь, что импортированные комментарии сохраняют время"
+        " создания из выгрузки."
+    )
+    assert Comment._meta.get_field('created_at').auto_now_add, (
+        "Убедитесь, что после импорта auto_now_add у created_at"
+        " восстанавливается."
+    )
@@ -0,0 +1,150 @@
+import re
+
+import pytest
+from blog.pagination import NEXT, encode_cursor
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _walk_cursor_pages(client, url):
+    pages = []
+    response = client.get(f'{url}?cursor=')
+    while True:
+        assert response.status_code == 200, (
+            f"Убедитесь, что курсорная страница `{url}` отображается"
+            " без ошибок."
+        )
+        pages.append(list(response.context['page_obj']))
+        next_cursor = response.context['page_obj'].next_cursor
+        if next_cursor is None:
+            return pages, response
+        response = client.get(f'{url}?cursor={next_cursor}')
+
+
+@pytest.mark.parametrize('url', ['/', '/category/{slug}/', '/profile/{user}/'])
+def test_cursor_pagination_walks_all_posts(
+        client, url, published_category, user,
+        many_posts_with_published_locations
+):
+    url = url.format(slug=published_category.slug, user=user.username)
+    pages, last = _walk_cursor_pages(client, url)
+    posts = [post for page in pages for post in page]
+    expected = sorted(
+        many_posts_with_published_locations,
+        key=lambda post: (post.pub_date, post.pk), reverse=True
+    )
+    assert posts == expected, (
+        "Убедитесь, что курсорная пагинация выдаёт все посты по одному разу"
+        " в порядке «от новых к старым»."
+    )
+    assert len(pages) == 2
+
+    previous_cursor = last.context['page_obj'].previous_cursor
+    response = client.get(f'{url}?cursor={previous_cursor}')
+    assert list(response.context['page_obj']) == pages[0], (
+        "Убедитесь, что ссылка на предыдущую страницу в курсорном режиме"
+        " возвращает к предыдущим постам."
+    )
+
+
+def test_cursor_pagination_skips_count(
+        client, many_posts_with_published_locations
+):
+    with CaptureQueriesContext(connection) as ctx:
+        client.get('/?cursor=')
+    assert not any(
+        re.search(r'COUNT\(', query['sql'])
+        for query in ctx.captured_queries
+    ), "Убедитесь, что курсорный режим не подсчитывает общее число постов."
+
+
+def test_invalid_cursor_returns_404(client):
+    assert client.get('/?cursor=not-a-cursor').status_code == 404
+
+
+@pytest.mark.parametrize('url, position', [
+    ('/?', '2020-01-01T00:00:00+00:00'),
+    ('/posts/{id}/comments/?', '2020-01-01T00:00:00+00:00'),
+    ('/search/?q=пост&', '1.0'),
+])
+@pytest.mark.parametrize('position_override, pk', [
+    (None, 10 ** 30),
+    (None, -1),
+    (None, 0),
+    ('2020-01-01T00:00:00', 1),
+    ('nan', 1),
+])
+def test_crafted_cursor_returns_404(
+        client, post_with_published_location, url, position,
+        position_override, pk
+):
+    cursor = encode_cursor(NEXT, position_override or position, pk)
+    url = url.format(id=post_with_published_location.id)
+    assert client.get(f'{url}cursor={cursor}').status_code == 404, (
+        "Убедитесь, что курсор с id вне диапазона ключей, датой без"
+        " часового пояса или нечисловым рангом отклоняется с кодом 404."
+    )
+
+
+def test_post_count_is_cached_and_invalidated(
+        mixer, user_client, user, published_category,
+        many_posts_with_published_locations
+):
+    user_client.get('/')
+    with CaptureQueriesContext(connection) as ctx:
+        response = user_client.get('/')
+    assert not any(
+        re.search(r'COUNT\(', query['sql'])
+        for query in ctx.captured_queries
+    ), "Убедитесь, что общее число постов на главной странице кэшируется."
+    assert response.context['paginator'].count == 20
+
+    mixer.blend('blog.Post', author=user, category=published_category)
+    response = user_client.get('/')
+    assert response.context['paginator'].count == 21, (
+        "Убедитесь, что закэшированное число постов сбрасывается"
+        " при добавлении поста."
+    )
+
+
+def test_paginator_renders_page_window(
+        mixer, client, user, published_category
+):
+    mixer.cycle(100).blend(
+        'blog.Post', author=user, category=published_category
+    )
+    content = client.get('/?page=5').content.decode('utf-8')
+    page_links = re.findall(r'href="\?page=(\d+)"', content)
+    assert sorted(set(map(int, page_links))) == [1, 3, 4, 6, 7, 10], (
+        "Убедитесь, что пагинатор выводит ссылки только на ближайшие"
+        " страницы, первую и последнюю."
+    )
+
+
+def test_comments_are_paginated_with_fragment_endpoint(
+        client, mixer, user, post_with_published_location
+):
+    post = post_with_published_location
+    comments = mixer.cycle(25).blend('blog.Comment', post=post)
+    response = client.get(f'/posts/{post.id}/')
+    first_page = response.context['comments']
+    assert list(first_page) == comments[:20], (
+        "Убедитесь, что на странице публикации выводится только первая"
+        " страница комментариев."
+    )
+    response = client.get(
+        f'/posts/{post.id}/comments/?cursor={first_page.next_cursor}'
+    )
+    assert response.status_code == 200
+    assert list(response.context['comments']) == comments[20:], (
+        "Убедитесь, что фрагмент комментариев отдаёт следующую страницу."
+    )
+    assert not response.context['comments'].has_next()
+
+    hidden_post = mixer.blend('blog.Post', author=user, is_published=False)
+    response = client.get(f'/posts/{hidden_post.id}/comments/')
+    assert response.status_code == 404, (
+        "Убедитесь, что комментарии к скрытым постам не отдаются гостям."
+    )
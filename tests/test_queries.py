@@ -0,0 +1,463 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from blog.cache import get_cache_timeout
+from blog.checks import check_shared_cache
+from blog.management.commands.run_publication_scheduler import Command
+from blog.models import Category, Comment, Post
+from blog.registry import get_registry
+from blog.utils import ensure_comment_count_triggers
+from core.constants import REGISTRY_MAX_AGE
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _count_queries(client, url):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200, (
+        f"Убедитесь, что страница `{url}` отображается без ошибок."
+    )
+    return len(ctx.captured_queries)
+
+
+def test_index_comment_count_in_single_query(
+        mixer, user_client, many_posts_with_published_locations
+):
+    user_client.get('/')
+    empty_queries = _count_queries(user_client, '/')
+    for post in many_posts_with_published_locations:
+        mixer.cycle(2).blend('blog.Comment', post=post)
+    user_client.get('/')
+    assert _count_queries(user_client, '/') == empty_queries, (
+        "Убедитесь, что число комментариев к постам на главной странице"
+        " вычисляется в запросе списка постов, а не отдельно для каждого"
+        " поста."
+    )
+    content = user_client.get('/').content.decode('utf-8')
+    assert 'Комментарии (2)' in content, (
+        "Убедитесь, что на карточке поста выводится число комментариев."
+    )
+
+
+def test_comment_count_follows_comment_changes(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    user_client.post(
+        f'/posts/{post.id}/comment/', data={'text': 'Новый комментарий'}
+    )
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        "Убедитесь, что счётчик комментариев поста увеличивается"
+        " при добавлении комментария."
+    )
+    comment = post.comments.get()
+    user_client.post(f'/posts/{post.id}/delete_comment/{comment.id}/')
+    post.refresh_from_db()
+    assert post.comment_count == 0, (
+        "Убедитесь, что счётчик комментариев поста уменьшается"
+        " при удалении комментария."
+    )
+
+
+def test_comment_count_kept_by_triggers(post_with_published_location):
+    post = post_with_published_location
+    Comment.objects.bulk_create(
+        Comment(post=post, author=post.author, text=f'Комментарий {i}')
+        for i in range(200)
+    )
+    post.refresh_from_db()
+    assert post.comment_count == 200, (
+        "Убедитесь, что счётчик комментариев учитывает комментарии,"
+        " созданные через bulk_create."
+    )
+    with connection.cursor() as cursor:
+        cursor.execute('DROP TRIGGER blog_comment_count_insert')
+    Comment.objects.create(post=post, author=post.author, text='Без триггера')
+    assert ensure_comment_count_triggers() == ['blog_comment_count_insert']
+    post.refresh_from_db()
+    assert post.comment_count == 201, (
+        "Убедитесь, что после восстановления триггеров счётчики"
+        " комментариев пересчитываются."
+    )
+
+
+def test_post_delete_does_not_depend_on_comment_count(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    Comment.objects.bulk_create(
+        Comment(post=post, author=post.author, text=f'Комментарий {i}')
+        for i in range(200)
+    )
+    with CaptureQueriesContext(connection) as ctx:
+        response = user_client.post(f'/posts/{post.id}/delete/')
+    assert response.status_code == 302
+    assert not Comment.objects.exists()
+    assert len(ctx.captured_queries) == 8, (
+        "Убедитесь, что комментарии удаляются вместе с постом одним"
+        " запросом, без обработчиков удаления каждого комментария."
+    )
+
+
+def test_repair_comment_counts(mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(3).blend('blog.Comment', post=post)
+    Post.objects.filter(pk=post.pk).update(comment_count=10)
+    call_command('repair_comment_counts', batch_size=1, stdout=StringIO())
+    post.refresh_from_db()
+    assert post.comment_count == 3, (
+        "Убедитесь, что команда repair_comment_counts исправляет"
+        " расхождение счётчика комментариев."
+    )
+
+
+def test_post_cards_are_cached_and_invalidated(
+        client, mixer, post_with_published_location
+):
+    post = post_with_published_location
+    client.get('/')
+    Post.objects.filter(pk=post.pk).update(title='Изменено в обход save()')
+    content = client.get('/').content.decode('utf-8')
+    assert post.title in content, (
+        "Убедитесь, что отрисованные карточки постов кэшируются."
+    )
+
+    category = post.category
+    category.title = 'Новое название категории'
+    category.save()
+    mixer.blend('blog.Comment', post=post)
+    content = client.get('/').content.decode('utf-8')
+    assert 'Новое название категории' in content, (
+        "Убедитесь, что карточки постов сбрасываются при изменении"
+        " категории."
+    )
+    assert 'Комментарии (1)' in content, (
+        "Убедитесь, что карточка поста сбрасывается при добавлении"
+        " комментария."
+    )
+
+
+def test_anonymous_list_pages_are_cached_and_purged(
+        client, user_client, mixer, user, post_with_published_location
+):
+    post = post_with_published_location
+    etag = client.get('/')['ETag']
+    assert _count_queries(client, '/') == 0, (
+        "Убедитесь, что главная страница для анонимных пользователей"
+        " отдаётся из кэша вместе с валидаторами, без запросов к базе."
+    )
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get('/', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304 and not ctx.captured_queries, (
+        "Убедитесь, что условный запрос к закэшированной странице"
+        " получает 304 по сохранённому ETag без запросов к базе."
+    )
+    assert _count_queries(user_client, '/') > 0, (
+        "Убедитесь, что авторизованным пользователям страницы"
+        " из кэша не отдаются."
+    )
+
+    new_post = mixer.blend(
+        'blog.Post', author=user, category=post.category
+    )
+    content = client.get('/').content.decode('utf-8')
+    assert new_post.title in content, (
+        "Убедитесь, что кэш главной страницы сбрасывается при добавлении"
+        " поста."
+    )
+    client.get(f'/category/{post.category.slug}/')
+    mixer.blend('blog.Comment', post=post)
+    content = client.get(
+        f'/category/{post.category.slug}/'
+    ).content.decode('utf-8')
+    assert 'Комментарии (1)' in content, (
+        "Убедитесь, что кэш страницы категории сбрасывается при добавлении"
+        " комментария к её посту."
+    )
+
+
+def test_cache_timeout_ends_at_next_publication(mixer, user):
+    mixer.blend(
+        'blog.Post', author=user,
+        pub_date=timezone.now() + timedelta(minutes=1)
+    )
+    assert 0 < get_cache_timeout(600) <= 60, (
+        "Убедитесь, что страницы кэшируются не дольше, чем до ближайшей"
+        " отложенной публикации."
+    )
+
+
+def test_conditional_get_returns_not_modified(
+        client, mixer, post_with_published_location
+):
+    post = post_with_published_location
+    etags = {}
+    for url in ('/', f'/posts/{post.id}/'):
+        response = client.get(url)
+        etag = etags[url] = response['ETag']
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, (
+            f"Убедитесь, что страница `{url}` отвечает 304 Not Modified"
+            " на запрос с актуальным ETag."
+        )
+        assert len(ctx.captured_queries) <= 1
+        response = client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        assert response.status_code == 304
+
+    mixer.blend('blog.Comment', post=post)
+    for url in ('/', f'/posts/{post.id}/'):
+        response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+        assert response.status_code == 200, (
+            f"Убедитесь, что после изменений страница `{url}` снова"
+            " отдаётся целиком."
+        )
+
+
+def test_post_detail_resolves_visibility_in_one_query(
+        client, user_client, mixer, user, post_with_published_location
+):
+    post = post_with_published_location
+    get_registry()
+    assert _count_queries(client, f'/posts/{post.id}/') == 2, (
+        "Убедитесь, что страница публикации для гостя загружает пост"
+        " одним запросом (и ещё одним — комментарии)."
+    )
+
+    hidden_post = mixer.blend(
+        'blog.Post', author=user, is_published=False,
+        category=post.category
+    )
+    assert client.get(f'/posts/{hidden_post.id}/').status_code == 404
+    assert user_client.get(f'/posts/{hidden_post.id}/').status_code == 200
+
+
+def test_post_lists_take_categories_from_registry(
+        client, user_client, mixer, user, published_category,
+        post_with_published_location
+):
+    url = f'/category/{published_category.slug}/'
+    user_client.get(url)
+    with CaptureQueriesContext(connection) as ctx:
+        user_client.get('/')
+        user_client.get(url)
+    sql = ' '.join(query['sql'] for query in ctx.captured_queries)
+    assert 'blog_category' not in sql and 'blog_location' not in sql, (
+        "Убедитесь, что списки постов берут категории и местоположения"
+        " из реестра, а не присоединяют их таблицы в запросе."
+    )
+
+    published_category.title = 'Новое название категории'
+    published_category.save()
+    response = user_client.get(url)
+    assert 'Новое название категории' in response.content.decode(), (
+        "Убедитесь, что реестр перечитывается после изменения категории."
+    )
+
+    published_category.is_published = False
+    published_category.save()
+    assert user_client.get(url).status_code == 404
+    assert client.get(
+        f'/posts/{post_with_published_location.id}/'
+    ).status_code == 404, (
+        "Убедитесь, что пост из снятой с публикации категории"
+        " скрыт от гостей и при работе через реестр."
+    )
+
+
+def test_registry_reloads_after_max_age(monkeypatch, published_category):
+    registry = get_registry()
+    # Другой процесс скрыл категорию, но сброс версии сюда не дошёл.
+    Category.objects.filter(pk=published_category.pk).update(
+        is_published=False
+    )
+    assert get_registry() is registry
+    loaded_at = registry.loaded_at
+    monkeypatch.setattr(
+        'blog.registry.time.monotonic',
+        lambda: loaded_at + REGISTRY_MAX_AGE + 1
+    )
+    published_ids = get_registry().published_category_ids
+    assert published_category.pk not in published_ids, (
+        "Убедитесь, что реестр перечитывается по истечении"
+        " REGISTRY_MAX_AGE, даже если его версия не менялась."
+    )
+
+
+def test_process_local_cache_is_reported_on_deploy(settings):
+    assert [
+        message.id for message in check_shared_cache(None)
+    ] == ['blog.W001']
+    settings.CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+    }}
+    assert check_shared_cache(None) == []
+
+
+def test_profile_author_resolved_once_by_id(
+        client, user_client, user, post_with_published_location
+):
+    url = f'/profile/{user.username}/'
+    user_client.get(url)
+    with CaptureQueriesContext(connection) as ctx:
+        response = user_client.get(url)
+    assert response.context['profile'] == user
+    post_queries = [
+        query['sql'] for query in ctx.captured_queries
+        if 'blog_post' in query['sql']
+    ]
+    assert post_queries and not any(
+        '"auth_user"."username"' in sql.split('WHERE')[-1]
+        for sql in post_queries
+    ), (
+        "Убедитесь, что посты профиля выбираются по author_id,"
+        " без фильтра по имени автора."
+    )
+    assert not any(
+        '"auth_user"."username" =' in query['sql']
+        for query in ctx.captured_queries
+    ), (
+        "Убедитесь, что автор профиля кэшируется по имени пользователя."
+    )
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get('/profile/no_such_user/')
+    assert response.status_code == 404
+    assert not any(
+        'blog_post' in query['sql'] for query in ctx.captured_queries
+    ), (
+        "Убедитесь, что для несуществующего пользователя страница"
+        " профиля отвечает 404 до запросов постов."
+    )
+
+
+def test_deleted_author_profile_is_not_cached(client, django_user_model):
+    author = django_user_model.objects.create(username='leaving')
+    for url in ('/profile/leaving/', '/profile/leaving/rss/'):
+        assert client.get(url).status_code == 200
+    author.delete()
+    for url in ('/profile/leaving/', '/profile/leaving/rss/'):
+        assert client.get(url).status_code == 404, (
+            "Убедитесь, что профиль и лента удалённого пользователя"
+            " отвечают 404, а не берутся из кэша."
+        )
+    newcomer = django_user_model.objects.create(username='leaving')
+    response = client.get('/profile/leaving/')
+    assert response.context['profile'].pk == newcomer.pk, (
+        "Убедитесь, что профиль нового пользователя с тем же именем"
+        " не подменяется закэшированным удалённым автором."
+    )
+
+
+@pytest.mark.parametrize('url, is_author', [
+    ('/', False),
+    ('/?page=2', False),
+    ('/?cursor=', False),
+    ('/category/{slug}/', False),
+    ('/category/{slug}/?cursor=', False),
+    ('/profile/{username}/', False),
+    ('/profile/{username}/', True),
+    ('/profile/{username}/?cursor=', True),
+])
+def test_post_lists_are_served_by_indexes(
+        client, user_client, mixer, user, post_with_published_location,
+        url, is_author
+):
+    post = post_with_published_location
+    # С несколькими категориями фильтр по ним уже не сводится
+    # к равенству, и неудачный план проявляется.
+    mixer.cycle(3).blend('blog.Category', is_published=True)
+    mixer.blend('blog.Category', is_published=False)
+    url = url.format(slug=post.category.slug, username=user.username)
+    with CaptureQueriesContext(connection) as ctx:
+        (user_client if is_author else client).get(url)
+    post_queries = [
+        query['sql'] for query in ctx.captured_queries
+        if query['sql'].startswith('SELECT') and 'FROM "blog_post"' in (
+            query['sql']
+        )
+    ]
+    assert post_queries
+    with connection.cursor() as cursor:
+        for sql in post_queries:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            plan = '\n'.join(row[-1] for row in cursor.fetchall())
+            assert 'TEMP B-TREE' not in plan, (
+                f"Убедитесь, что запрос страницы `{url}` читает посты"
+                f" по индексу в нужном порядке, без временного B-дерева:"
+                f"\n{sql}\n{plan}"
+            )
+
+
+@pytest.mark.parametrize('url, data, expected_queries', [
+    # Сессия, пользователь, пост; при сохранении — ещё области видимости
+    # поста до и после изменения и сам UPDATE.
+    ('/posts/{id}/edit/', None, 5),
+    ('/posts/{id}/edit/', {
+        'title': 'Заголовок', 'text': 'Текст', 'pub_date': '2020-01-01 00:00'
+    }, 8),
+    ('/posts/{id}/delete/', None, 4),
+    # Удаление каскадно удаляет комментарии и задания обработки фото.
+    ('/posts/{id}/delete/', {}, 8),
+    ('/posts/{id}/comment/', {'text': 'Комментарий'}, 8),
+])
+def test_post_change_views_fetch_post_once(
+        user_client, post_with_published_location, url, data,
+        expected_queries
+):
+    post = post_with_published_location
+    url = url.format(id=post.id)
+    if data is not None and 'title' in data:
+        data['category'] = post.category_id
+    with CaptureQueriesContext(connection) as ctx:
+        if data is None:
+            response = user_client.get(url)
+        else:
+            response = user_client.post(url, data)
+    assert response.status_code == (200 if data is None else 302)
+    assert len(ctx.captured_queries) == expected_queries, (
+        f"Убедитесь, что `{url}` загружает пост не более одного раза."
+    )
+    post_selects = [
+        query['sql'] for query in ctx.captured_queries
+        if query['sql'].startswith(
+            'SELECT "blog_post"."id", "blog_post"."created_at"'
+        )
+    ]
+    assert len(post_selects) <= 1, (
+        f"Убедитесь, что `{url}` загружает пост не более одного раза."
+    )
+
+
+def test_comment_to_missing_post_returns_404(user_client):
+    response = user_client.post('/posts/404/comment/', {'text': 'Текст'})
+    assert response.status_code == 404
+
+
+def test_publication_scheduler_purges_due_scopes(
+        settings, client, mixer, user, published_category
+):
+    settings.PUBLICATION_SCHEDULER_ENABLED = True
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        pub_date=timezone.now() + timedelta(hours=1)
+    )
+    client.get('/')
+    pub_date = timezone.now() - timedelta(seconds=1)
+    Post.objects.filter(pk=post.pk).update(pub_date=pub_date)
+    assert post.title not in client.get('/').content.decode('utf-8')
+
+    Command().publish_due([(pub_date, post.pk)])
+    assert post.title in client.get('/').content.decode('utf-8'), (
+        "Убедитесь, что планировщик публикаций сбрасывает кэш страниц"
+        " в момент публикации поста."
+    )
@@ -0,0 +1,136 @@
+import pytest
+from blog.models import Post
+from blog.search import (SEARCH_TRIGGERS, build_match_query,
+                         ensure_search_triggers)
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _post(mixer, category, title, text='', is_published=True):
+    return mixer.blend(
+        'blog.Post', category=category, title=title, text=text,
+        is_published=is_published, pub_date=timezone.now()
+    )
+
+
+def _found(client, query, **params):
+    response = client.get('/search/', {'q': query, **params})
+    assert response.status_code == 200
+    return response, [post.id for post in response.context['page_obj']]
+
+
+def test_build_match_query_ignores_fts_syntax():
+    assert build_match_query('кот" OR NEAR(') == '"кот"* "OR"* "NEAR"*'
+    assert build_match_query('  ') == ''
+
+
+def test_search_ranks_and_respects_visibility(
+        client, mixer, published_category
+):
+    in_title = _post(mixer, published_category, 'Рыжий кот', 'Текст')
+    in_text = _post(
+        mixer, published_category, 'Заметка', 'Про котов и кошек'
+    )
+    _post(mixer, published_category, 'Собаки', 'Только собаки')
+    _post(
+        mixer, published_category, 'Скрытый кот', is_published=False
+    )
+    hidden_category = mixer.blend('blog.Category', is_published=False)
+    _post(mixer, hidden_category, 'Кот в скрытой категории')
+
+    _, found = _found(client, 'кот')
+    assert found == [in_title.id, in_text.id], (
+        "Убедитесь, что поиск находит посты по префиксу слова, ставит"
+        " совпадения в заголовке выше и не показывает скрытые посты."
+    )
+
+
+def test_search_index_follows_post_changes(client, mixer, published_category):
+    post = _post(mixer, published_category, 'Первое название')
+    assert _found(client, 'первое')[1] == [post.id]
+    post.title = 'Второе название'
+    post.save()
+    assert _found(client, 'первое')[1] == []
+    assert _found(client, 'второе')[1] == [post.id]
+    Post.objects.filter(pk=post.pk).update(text='Обновлено через update')
+    assert _found(client, 'обновлено')[1] == [post.id]
+    post.delete()
+    assert _found(client, 'второе')[1] == []
+
+
+@pytest.mark.parametrize('params', [{}, {'q': ''}, {'q': '*'}, {'q': '!!!'}])
+def test_search_without_terms_is_empty(client, mixer, published_category,
+                                       params):
+    _post(mixer, published_category, 'Заголовок', 'текст')
+    response = client.get('/search/', params)
+    assert response.status_code == 200, (
+        "Убедитесь, что страница поиска без слов для поиска открывается."
+    )
+    assert list(response.context['page_obj']) == [], (
+        "Убедитесь, что поиск без слов для поиска ничего не находит."
+    )
+
+
+def test_search_cursor_pagination(client, mixer, published_category):
+    posts = [
+        _post(mixer, published_category, f'Пост {i}', 'общий')
+        for i in range(15)
+    ]
+    response, first = _found(client, 'общий')
+    assert len(first) == 10
+    cursor = response.context['page_obj'].next_cursor
+    assert f'?q=%D0%BE%D0%B1%D1%89%D0%B8%D0%B9&amp;cursor={cursor}' in (
+        response.content.decode()
+    ), "Убедитесь, что ссылка на следующую страницу сохраняет запрос."
+    response, second = _found(client, 'общий', cursor=cursor)
+    assert sorted(first + second) == sorted(post.id for post in posts)
+    assert not response.context['page_obj'].has_next()
+    assert client.get(
+        '/search/', {'q': 'общий', 'cursor': 'мусор'}
+    ).status_code == 404
+
+
+def test_admin_search_uses_index(client, mixer, published_category):
+    admin = get_user_model().objects.create_superuser(
+        'admin', 'admin@example.com', 'password'
+    )
+    client.force_login(admin)
+    post = _post(mixer, published_category, 'Заголовок', 'редкоеслово')
+    response = client.get('/admin/blog/post/', {'q': 'редкоеслово'})
+    assert response.status_code == 200
+    assert list(response.context['cl'].result_list) == [post]
+
+
+def _trigger_names():
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger'"
+        )
+        return {name for name, in cursor.fetchall()}
+
+
+def test_search_triggers_exist_after_migrations():
+    assert set(SEARCH_TRIGGERS) <= _trigger_names(), (
+        'После миграций должны существовать все триггеры индекса поиска.'
+    )
+
+
+def test_missing_search_triggers_are_restored(
+        client, mixer, published_category
+):
+    with connection.cursor() as cursor:
+        cursor.execute('DROP TRIGGER blog_post_search_insert')
+    post = _post(mixer, published_category, 'Пропущенный', 'незамеченный')
+    assert ensure_search_triggers() == ['blog_post_search_insert'], (
+        'Недостающий триггер поиска должен создаваться заново.'
+    )
+    assert set(SEARCH_TRIGGERS) <= _trigger_names()
+    assert _found(client, 'незамеченный')[1] == [post.id], (
+        'После восстановления триггеров индекс должен быть перестроен.'
+    )
+    assert ensure_search_triggers() == [], (
+        'Повторный вызов не должен ничего менять.'
+    )
@@ -0,0 +1,149 @@
+import io
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db.models import Count, F
+from django.utils import timezone
+
+from blog.models import Category, Comment, Location, Post, User
+from blog.seeding import get_seed_now
+
+POST_FIELDS = (
+    'title', 'text', 'pub_date', 'created_at', 'updated_at',
+    'is_published', 'image', 'comment_count', 'author__username',
+    'category__slug', 'category__title', 'category__is_published',
+    'location__name',
+)
+COMMENT_FIELDS = ('text', 'created_at', 'author__username', 'post__title')
+
+pytestmark = [pytest.mark.django_db]
+
+
+def seed(prefix, seed=1):
+    """Заполняет базу и возвращает строки постов и комментариев
+    с префиксом prefix, убранным из имён и слагов.
+    """
+    call_command(
+        'seed_benchmark', '--users=20', '--categories=5', '--locations=5',
+        '--posts=400', '--comments=600', '--batch-size=150',
+        f'--seed={seed}', f'--prefix={prefix}', stdout=io.StringIO()
+    )
+    authored = {'author__username__startswith': f'{prefix}_'}
+    posts = Post.objects.filter(**authored).order_by('pk')
+    comments = Comment.objects.filter(**authored).order_by('pk')
+    return (
+        [_strip_prefix(row, prefix) for row in posts.values(*POST_FIELDS)],
+        [_strip_prefix(row, prefix)
+         for row in comments.values(*COMMENT_FIELDS)],
+    )
+
+
+def _strip_prefix(row, prefix):
+    return {
+        name: value.replace(prefix, '', 1)
+        if name in ('author__username', 'category__slug') else value
+        for name, value in row.items()
+    }
+
+
+def test_seed_benchmark_creates_dataset():
+    posts, _ = seed('first')
+    seed_now = get_seed_now()
+    assert User.objects.filter(username__startswith='first_').count() == 20, (
+        "Убедитесь, что создаётся заданное число пользователей."
+    )
+    assert Category.objects.count() == 5, (
+        "Убедитесь, что создаётся заданное число категорий."
+    )
+    assert Location.objects.count() == 5, (
+        "Убедитесь, что создаётся заданное число местоположений."
+    )
+    assert len(posts) == 400, (
+        "Убедитесь, что создаётся заданное число постов."
+    )
+    assert Comment.objects.count() == 600, (
+        "Убедитесь, что создаётся заданное число комментариев."
+    )
+    assert any(post['pub_date'] > timezone.now() for post in posts), (
+        "Убедитесь, что часть постов отложена на будущее относительно"
+        " текущего времени."
+    )
+    assert all(post['updated_at'] <= seed_now for post in posts), (
+        "Убедитесь, что время изменения постов отсчитывается от заданного"
+        " момента."
+    )
+    assert not Comment.objects.filter(created_at__gt=seed_now).exists(), (
+        "Убедитесь, что даты комментариев отсчитываются от заданного"
+        " момента."
+    )
+    assert not Comment.objects.filter(
+        created_at__lt=F('post__created_at')
+    ).exists(), (
+        "Убедитесь, что комментарии не старше своих постов."
+    )
+    assert not all(post['is_published'] for post in posts), (
+        "Убедитесь, что часть постов снята с публикации."
+    )
+    mismatched = Post.objects.annotate(
+        actual=Count('comments')
+    ).exclude(comment_count=F('actual'))
+    assert not mismatched.exists(), (
+        "Убедитесь, что счётчики комментариев совпадают с числом"
+        " комментариев."
+    )
+
+
+def test_seed_benchmark_is_deterministic():
+    first = seed('first')
+    second = seed('second')
+    assert first == second, (
+        "Убедитесь, что при одинаковом seed создаются одинаковые посты"
+        " и комментарии, включая все даты."
+    )
+    assert seed('third', seed=2) != first, (
+        "Убедитесь, что при разных seed данные различаются."
+    )
+
+
+def test_seed_benchmark_prints_now():
+    output = io.StringIO()
+    call_command(
+        'seed_benchmark', '--users=1', '--categories=0', '--locations=0',
+        '--posts=0', '--comments=0', stdout=output
+    )
+    assert f'--now={get_seed_now().isoformat()}' in output.getvalue(), (
+        "Убедитесь, что команда выводит момент отсчёта дат."
+    )
+
+
+def test_seed_benchmark_refuses_existing_prefix():
+    seed('first')
+    with pytest.raises(CommandError, match='--prefix'):
+        seed('first')
+
+
+def test_seed_benchmark_dates_follow_now_option():
+    call_command(
+        'seed_benchmark', '--users=2', '--categories=1', '--locations=0',
+        '--posts=20', '--comments=0', '--now=2020-06-01T00:00:00+00:00',
+        stdout=io.StringIO()
+    )
+    latest = Post.objects.order_by('-pub_date').first().pub_date
+    assert latest.year == 2020, (
+        "Убедитесь, что даты постов отсчитываются от момента из --now."
+    )
+
+
+def test_benchmark_post_queries_runs_after_seed_benchmark():
+    call_command(
+        'seed_benchmark', '--users=2', '--categories=1', '--locations=0',
+        '--posts=5', '--comments=0', stdout=io.StringIO()
+    )
+    call_command(
+        'benchmark_post_queries', '--posts=20', '--authors=2',
+        '--categories=2', '--repeat=1', stdout=io.StringIO()
+    )
+    assert Post.objects.count() == 5, (
+        "Убедитесь, что benchmark_post_queries откатывает свои данные"
+        " и не конфликтует с данными seed_benchmark."
+    )
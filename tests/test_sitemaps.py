@@ -0,0 +1,110 @@
+import re
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.http import StreamingHttpResponse
+
+pytestmark = [pytest.mark.django_db]
+
+BASE_URL = 'http://testserver'
+
+
+@pytest.fixture
+def small_shards(monkeypatch):
+    monkeypatch.setattr('blog.cache.SITEMAP_SHARD_SIZE', 2)
+    monkeypatch.setattr('blog.sitemaps.SITEMAP_SHARD_SIZE', 2)
+
+
+@pytest.fixture
+def posts(mixer, user, published_category):
+    return [
+        mixer.blend(
+            'blog.Post', author=user, category=published_category,
+            is_published=i != 1
+        )
+        for i in range(5)
+    ]
+
+
+def _content(response):
+    if isinstance(response, StreamingHttpResponse):
+        return b''.join(response.streaming_content).decode()
+    return response.content.decode()
+
+
+def test_sitemap_index_lists_shards(client, small_shards, posts):
+    content = client.get('/sitemap.xml').content.decode()
+    locations = re.findall(r'<loc>([^<]+)</loc>', content)
+    max_pk = posts[-1].pk
+    expected_post_shards = [
+        f'{BASE_URL}/sitemap-posts-{shard}.xml'
+        for shard in range(max_pk // 2 + 1)
+    ]
+    assert f'{BASE_URL}/sitemap-categories-0.xml' in locations
+    assert all(url in locations for url in expected_post_shards), (
+        "Убедитесь, что индекс карты сайта ссылается на все части постов."
+    )
+    assert f'{BASE_URL}/sitemap-authors-0.xml' in locations
+
+
+def test_sitemap_shards_list_visible_posts(
+        client, small_shards, posts, user, published_category
+):
+    found = []
+    for shard in range(posts[-1].pk // 2 + 1):
+        response = client.get(f'/sitemap-posts-{shard}.xml')
+        assert isinstance(response, StreamingHttpResponse), (
+            "Убедитесь, что части карты сайта строятся потоком."
+        )
+        found += re.findall(r'/posts/(\d+)/', _content(response))
+        cached = client.get(f'/sitemap-posts-{shard}.xml')
+        assert not isinstance(cached, StreamingHttpResponse), (
+            "Убедитесь, что построенная часть берётся из кэша."
+        )
+    assert sorted(map(int, found)) == sorted(
+        post.pk for post in posts if post.is_published
+    )
+    assert f'/category/{published_category.slug}/' in _content(
+        client.get('/sitemap-categories-0.xml')
+    )
+    assert f'/profile/{user.username}/' in _content(
+        client.get('/sitemap-authors-0.xml')
+    )
+    assert client.get('/sitemap-comments-0.xml').status_code == 404
+
+
+def test_generate_sitemaps_rebuilds_changed_shards_only(
+        small_shards, posts
+):
+    def built():
+        out = StringIO()
+        call_command('generate_sitemaps', BASE_URL, stdout=out)
+        return re.findall(r'Построена часть (\S+)', out.getvalue())
+
+    assert 'posts-0' in built()
+    assert built() == [], (
+        "Убедитесь, что неизменившиеся части не перестраиваются."
+    )
+    changed = posts[-1]
+    changed.title = 'Изменённый пост'
+    changed.save()
+    assert built() == [f'posts-{changed.pk // 2}'], (
+        "Убедитесь, что перестраивается только часть изменённого поста."
+    )
+
+
+def test_authors_shard_follows_new_and_deleted_users(
+        client, django_user_model, user
+):
+    url = '/sitemap-authors-0.xml'
+    assert f'/profile/{user.username}/' in _content(client.get(url))
+    new_user = django_user_model.objects.create(username='newcomer')
+    assert '/profile/newcomer/' in _content(client.get(url)), (
+        "Убедитесь, что новый пользователь появляется в карте сайта"
+        " сразу, а не по истечении срока кэша."
+    )
+    new_user.delete()
+    assert '/profile/newcomer/' not in _content(client.get(url)), (
+        "Убедитесь, что удалённый пользователь пропадает из карты сайта."
+    )